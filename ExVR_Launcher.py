@@ -1,21 +1,175 @@
 import sys
-import pyuac
-if not pyuac.isUserAdmin():
-    pyuac.runAsAdmin()
-    sys.exit(0)
+if sys.platform == "win32":
+    # 与 pyuac.isUserAdmin 相同的检查，只有需要提权时才导入 pyuac
+    import ctypes
+    if not ctypes.windll.shell32.IsUserAnAdmin():
+        import pyuac
+        pyuac.runAsAdmin()
+        sys.exit(0)
 import os
 import json
+import hashlib
 import time
 import shutil
+import socket
 import tempfile
 import subprocess
 import re
-import zipfile
-import requests
-import argparse
-from PySide6.QtWidgets import *
-from PySide6.QtCore import *
-from PySide6.QtGui import *
+import html
+import struct
+import zlib
+import threading
+import queue
+import abc
+import collections
+import copy
+import contextlib
+import concurrent.futures
+from urllib.parse import urljoin, unquote, urlsplit
+
+
+class LazyModule:
+    """第一次访问属性时才导入模块，热启动用不到的模块不占用启动时间
+
+    loader 里必须是真正的 import 语句，PyInstaller 靠它发现依赖并打包进 exe
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = self._loader()
+        return getattr(self._module, attr)
+
+
+def _import_requests():
+    import requests
+    return requests
+
+
+def _import_zipfile():
+    import zipfile
+    return zipfile
+
+
+def _import_qt_widgets():
+    from PySide6 import QtWidgets
+    return QtWidgets
+
+
+def _import_qt_core():
+    from PySide6 import QtCore
+    return QtCore
+
+
+requests = LazyModule(_import_requests)
+zipfile = LazyModule(_import_zipfile)
+# 只有 Qt 界面用到 PySide6，--headless 和热启动不会导入
+QtWidgets = LazyModule(_import_qt_widgets)
+QtCore = LazyModule(_import_qt_core)
+
+
+# 工作线程和信号不依赖 PySide6，界面只在需要时才导入 QtWidgets/QtCore
+class SignalInstance:
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot, direct=False):
+        self._slots.append((slot, direct))
+
+    def disconnect(self, slot=None):
+        self._slots = [(s, d) for s, d in self._slots if slot is not None and s != slot]
+
+    def emit(self, *args):
+        # 与 Qt 的 AutoConnection 相同：其他线程发出的信号交给主线程的事件循环执行
+        for slot, direct in list(self._slots):
+            if direct or threading.current_thread() is threading.main_thread():
+                slot(*args)
+            else:
+                EventLoop.post(slot, *args)
+
+
+class Signal:
+    def __init__(self, *types):
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = f"_signal_{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.setdefault(self.name, SignalInstance())
+
+
+class WorkerThread:
+    started = Signal()
+    finished = Signal()
+
+    def __init__(self):
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._bootstrap, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def _bootstrap(self):
+        self.started.emit()
+        try:
+            self.run()
+        finally:
+            self.finished.emit()
+
+    def run(self):
+        pass
+
+    def isRunning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        if self._thread is None or self._thread is threading.current_thread():
+            return True
+        self._thread.join(None if timeout is None else timeout / 1000)
+        return not self._thread.is_alive()
+
+    def quit(self):
+        pass
+
+    def terminate(self):
+        pass
+
+
+class EventLoop:
+    """主线程的事件队列，执行工作线程通过信号投递过来的回调；Qt 界面下由定时器处理"""
+
+    _events = queue.Queue()
+    _quit = object()
+
+    @classmethod
+    def post(cls, callback, *args):
+        cls._events.put((callback, args))
+
+    @classmethod
+    def process_pending(cls):
+        while True:
+            try:
+                callback, args = cls._events.get_nowait()
+            except queue.Empty:
+                return
+            if callback is not cls._quit:
+                callback(*args)
+
+    def exec(self):
+        while True:
+            callback, args = self._events.get()
+            if callback is self._quit:
+                return 0
+            callback(*args)
+
+    def quit(self):
+        self.post(self._quit)
 
 # pyinstaller --name ExVR_Launcher --onefile --windowed --icon=./res/logo.ico --upx-dir=D:\software\upx-4.2.4-win64 launcher.py
 # pyinstaller --name ExVR_Launcher --onefile --windowed --uac-admin --icon=./res/logo.ico --upx-dir=D:\software\upx-4.2.4-win64 launcher.py
@@ -24,37 +178,161 @@ from PySide6.QtGui import *
 def get_config_file_path():
     return get_resource_path("exvr_config.json")
 
-def load_config():
-    config_path = get_config_file_path()
-    if os.path.exists(config_path):
+@contextlib.contextmanager
+def file_lock(path, timeout):
+    """跨进程的文件锁，Windows 用 msvcrt，其他平台用 fcntl"""
+    with open(path, "a+b") as f:
+        deadline = time.time() + timeout
+        while True:
+            try:
+                if sys.platform == "win32":
+                    import msvcrt
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {path}")
+                time.sleep(0.05)
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            yield f
+        finally:
+            if sys.platform == "win32":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def migrate_config_v1(config):
+    # 服务器数据改存到元数据缓存
+    config.pop("ServerData", None)
+
+
+# 第 i 项把 schema 版本 i 的配置升级到 i + 1
+CONFIG_MIGRATIONS = [migrate_config_v1]
+CONFIG_SCHEMA_VERSION = len(CONFIG_MIGRATIONS)
+
+
+class ConfigStore:
+    """exvr_config.json 只在第一次使用时读取，之后在内存中修改，每个事务结束时一次性原子写入"""
+
+    def __init__(self, path=None):
+        self._path = path
+        self._data = None
+        self._lock = threading.RLock()
+        self._snapshots = []
+
+    @property
+    def path(self):
+        # 第一次使用时确定路径，之后切换工作目录（例如启动 ExVR 前）不再影响
+        if self._path is None:
+            self._path = get_config_file_path()
+        return self._path
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("config is not a JSON object")
+            return data
         except Exception as e:
-            log(f"Error loading config: {e}")
+            # 保留损坏的文件以便排查，不直接覆盖
+            log(f"Error loading config, moving it aside: {e}")
+            os.replace(self.path, self.path + ".corrupt")
             return {}
-    return {}
 
+    def _migrate(self, data):
+        version = data.get("SchemaVersion", 0)
+        if version > CONFIG_SCHEMA_VERSION:
+            log(f"Config schema {version} is newer than this launcher ({CONFIG_SCHEMA_VERSION}), not migrating")
+            return False
+        for migrate in CONFIG_MIGRATIONS[version:]:
+            migrate(data)
+        data["SchemaVersion"] = CONFIG_SCHEMA_VERSION
+        return version != CONFIG_SCHEMA_VERSION
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json_atomic(self.path, data, durable=True)
+        log(f"Config saved to: {self.path}")
+
+    def _ensure_loaded(self):
+        if self._data is not None:
+            return
+        data = self._read()
+        if data and self._migrate(data):
+            with file_lock(self.path + ".lock", CONFIG_LOCK_TIMEOUT):
+                self._write(data)
+        self._data = data
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._ensure_loaded()
+            # 返回副本，避免调用方在事务外修改内存中的配置
+            return copy.deepcopy(self._data.get(key, default))
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """在事务中直接修改 yield 出的 dict，最外层事务结束时只写一次；出错则放弃这一层的修改"""
+        with self._lock:
+            self._ensure_loaded()
+            # 每一层保存自己的快照，内层出错被外层捕获时也只撤销内层的修改
+            self._snapshots.append(copy.deepcopy(self._data))
+            try:
+                yield self._data
+            except BaseException:
+                # 原地恢复，外层事务拿到的还是同一个 dict
+                self._data.clear()
+                self._data.update(self._snapshots[-1])
+                raise
+            finally:
+                before = self._snapshots.pop()
+            if not self._snapshots:
+                self._flush(before)
+
+    def _flush(self, before):
+        changed = {key: value for key, value in self._data.items() if before.get(key, object()) != value}
+        removed = [key for key in before if key not in self._data]
+        if not changed and not removed:
+            return
+        try:
+            with file_lock(self.path + ".lock", CONFIG_LOCK_TIMEOUT):
+                # 只合并本进程改过的键，其他启动器进程写入的键保留
+                data = self._read()
+                self._migrate(data)
+                data.update(changed)
+                for key in removed:
+                    data.pop(key, None)
+                self._write(data)
+        except Exception as e:
+            self._data = before
+            log(f"Error saving config: {e}")
+            raise
+        self._data = data
+
+    def delete(self):
+        with self._lock, file_lock(self.path + ".lock", CONFIG_LOCK_TIMEOUT):
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                log(f"Config deleted: {self.path}")
+            else:
+                log("Config file does not exist.")
+            self._data = {}
+
+
+config_store = ConfigStore()
 
-def save_config(config):
-    config_path = get_config_file_path()
-    try:
-        os.makedirs(os.path.dirname(config_path), exist_ok=True)
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        log(f"Config saved to: {config_path}")
-    except Exception as e:
-        log(f"Error saving config: {e}")
-        raise
 
 def delete_config():
-    config_path = get_config_file_path()
     try:
-        if os.path.exists(config_path):
-            os.remove(config_path)
-            log(f"Config deleted: {config_path}")
-        else:
-            log("Config file does not exist.")
+        config_store.delete()
     except Exception as e:
         log(f"Error deleting config: {e}")
         raise
@@ -62,8 +340,9 @@ APP_NAME = "EXVR"
 APP_REG_PATH = r"SOFTWARE\EXVR"
 PYTHON_VERSION = "3.11"
 PYTHON_DOWNLOAD_URL = "https://mirrors.huaweicloud.com/python/3.11.9/python-3.11.9-amd64.exe"
+GITHUB_PROXY = "https://gh-proxy.com/"
 GITHUB2_API_URL = "https://api.github.com/repos/{owner}/{repo}/releases/latest"
-GITHUB_API_URL = "https://gh-proxy.com/https://api.github.com/repos/{owner}/{repo}/releases/latest"
+GITHUB_API_URL = GITHUB_PROXY + GITHUB2_API_URL
 UPDATE_CHECK_URLS = [
     "https://gh-proxy.com/raw.githubusercontent.com/ExVR-Doc/ExVR-Doc.github.io/main/docs/exvrserverdata.json",
     "https://gh-proxy.com/https://raw.githubusercontent.com/ExVR-Doc/ExVR-Doc.github.io/main/docs/exvrserverdata.json",
@@ -73,14 +352,48 @@ GITHUB_REPO_OWNER = "xiaofeiyu0723"
 GITHUB_REPO_NAME = "ExVR"
 CUSTOM_FOLDER_NAME = "config"
 REQUEST_TIMEOUT = 10
+SERVER_DATA_TIMEOUT = 5
+SERVER_DATA_BUDGET = 8
+SERVER_DATA_DEADLINE = 3
+METADATA_CACHE_NAME = "exvr_metadata_cache.json"
+METADATA_CACHE_TTL = 10 * 60
+CONFIG_LOCK_TIMEOUT = 10
+EXIT_LAUNCHER_OUTDATED = 3
+INSTANCE_LOCK_NAME = "exvr_launcher.lock"
+INSTANCE_INFO_NAME = "exvr_launcher.json"
+INSTANCE_CONNECT_TIMEOUT = 5
+INSTANCE_IO_TIMEOUT = 5
+RELEASE_INFO_TIMEOUT = 5
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_SEGMENTS = 4
+DOWNLOAD_MIN_SEGMENT_SIZE = 512 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_BACKOFF_BASE = 1
+DOWNLOAD_BACKOFF_MAX = 30
+PARTIAL_DOWNLOAD_FOLDER = "downloads"
+PARTIAL_DOWNLOAD_MAX_AGE = 7 * 24 * 3600
+DOWNLOAD_CACHE_FOLDER = "cache"
+DOWNLOAD_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+WHEELHOUSE_FOLDER = "wheelhouse"
+WHEELHOUSE_KEEP_SETS = 5
+VENV_SNAPSHOT_FOLDER = "snapshots"
+VENV_SNAPSHOT_KEEP = 2
 PYTHON_CHECK_TIMEOUT = 5
 IGNORED_FOLDERS = []
+RELEASE_MANIFEST_NAME = ".exvr_manifest.json"
+DELTA_UPDATE_MAX_RATIO = 0.5
+DELTA_RANGE_GAP = 64 * 1024
+ZIP_TAIL_SIZE = 64 * 1024 + 22
+PIPELINE_QUEUE_SIZE = 256
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
 LAU_VERSION = 1
 LAU_MAPPING = {
     "modules\\palm_detection_lite.tflite": "mediapipe\\modules\\palm_detection\\palm_detection_lite.tflite",
     "modules\\hand_landmark_tracking_cpu.binarypb": "mediapipe\\modules\\hand_landmark\\hand_landmark_tracking_cpu.binarypb",
 }
 server_data = {}
+server_data_future = None
+server_data_deadline = 0
 release = "live"
 PIP_MIRRORS = [
     "https://pypi.tuna.tsinghua.edu.cn/simple",
@@ -88,28 +401,80 @@ PIP_MIRRORS = [
     "http://pypi.mirrors.ustc.edu.cn/simple/",
     "https://pypi.mirrors.ustc.edu.cn/simple/"
 ]
+PIP_MIRROR_PROBE_TIMEOUT = 5
+PIP_MIRROR_PROBE_BYTES = 64 * 1024
+PIP_MIRROR_HISTORY_WEIGHT = 0.7
+PIP_MIRROR_HALF_LIFE = 7 * 24 * 3600
+PIP_PREFETCH_WORKERS = 4
+PIP_TARGET_PYTHON = "3.11"
+PIP_OUTPUT_TAIL_LINES = 200
+PIP_INSTALL_POLL_INTERVAL = 0.5
 
 def get_install_path():
-    config = load_config()
-    return config.get("InstallPath")
+    return config_store.get("InstallPath")
 
 
 def get_python_path():
-    config = load_config()
-    return config.get("PythonPath")
+    return config_store.get("PythonPath")
 
 
 def set_install_path(path):
-    config = load_config()
-    config["InstallPath"] = path
-    config["release"] = "live"
-    save_config(config)
+    with config_store.transaction() as config:
+        config["InstallPath"] = path
+        config["release"] = "live"
 
 
 def set_python_path(path):
-    config = load_config()
-    config["PythonPath"] = path
-    save_config(config)
+    with config_store.transaction() as config:
+        config["PythonPath"] = path
+
+
+def get_cache_max_size():
+    return config_store.get("CacheMaxSize", DOWNLOAD_CACHE_MAX_SIZE)
+
+
+def set_cache_max_size(size):
+    with config_store.transaction() as config:
+        config["CacheMaxSize"] = size
+
+
+def get_dependency_check():
+    return config_store.get("DependencyCheck", {})
+
+
+def set_dependency_check(check):
+    with config_store.transaction() as config:
+        config["DependencyCheck"] = check
+
+
+def get_installed_requirements():
+    return config_store.get("InstalledRequirements", {})
+
+
+def set_installed_requirements(record):
+    with config_store.transaction() as config:
+        config["InstalledRequirements"] = record
+
+
+def get_delta_updates_enabled():
+    return config_store.get("DeltaUpdates", True)
+
+
+def get_github_proxies():
+    return config_store.get("GithubProxies", [])
+
+
+def get_metadata_cache_ttl():
+    return config_store.get("MetadataCacheTTL", METADATA_CACHE_TTL)
+
+
+def get_pip_mirror_health():
+    return config_store.get("PipMirrorHealth", {})
+
+
+def set_pip_mirror_health(health):
+    with config_store.transaction() as config:
+        config["PipMirrorHealth"] = health
 
 
 def get_resource_path(relative_path: str) -> str:
@@ -204,13 +569,21 @@ QComboBox QAbstractItemView {
 
 
 def parse_arguments():
+    import argparse
     parser = argparse.ArgumentParser(description='EXVR Installer')
     parser.add_argument('-log', action='store_true', help='Enable detailed logging to console')
+    parser.add_argument('--verify', action='store_true', help='Verify installed files and repair damaged ones')
+    parser.add_argument('--trace', action='store_true', help='Write a Chrome trace of launcher phases to logs')
+    parser.add_argument('--headless', action='store_true', help='Run without any UI, logging progress to stdout; '
+                        f'exits with {EXIT_LAUNCHER_OUTDATED} if the launcher itself needs an update')
+    parser.add_argument('--install-path', help='Install to this folder instead of asking')
+    parser.add_argument('--update', choices=['ask', 'always', 'never'], default=None,
+                        help='Whether to install available updates (default: ask, or always with --headless)')
     return parser.parse_known_args()[0]
 
 
 def setup_logging(args):
-    if args.log:
+    if args.log and not args.headless:
         import ctypes
         ctypes.windll.kernel32.AllocConsole()
         sys.stdout = open('CONOUT$', 'w')
@@ -220,7 +593,7 @@ def setup_logging(args):
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, f"installer_{time.strftime('%Y%m%d_%H%M%S')}.log")
 
-    if args.log:
+    if args.log or args.headless:
         class TeeOutput:
             def __init__(self, file_stream, console_stream):
                 self.file_stream = file_stream
@@ -252,6 +625,113 @@ def log(message):
     print(f"[{timestamp}] {message}")
 
 
+class Tracer:
+    """--trace 时记录各阶段、网络请求、子进程和工作线程的耗时，退出时写出 Chrome trace-event JSON"""
+
+    def __init__(self):
+        self.enabled = False
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events = []
+        self._threads = {}
+        self._phase = None
+        self._phase_durations = {}
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        # 所有 requests 调用最终都经过 Session.send，在这里统一记录网络请求
+        send = requests.Session.send
+        tracer = self
+
+        def traced_send(session, request, **kwargs):
+            with tracer.span(f"{request.method} {urlsplit(request.url).netloc}", "network", url=request.url) as args:
+                response = send(session, request, **kwargs)
+                args["status"] = response.status_code
+                args["bytes"] = int(response.headers.get("content-length") or 0)
+                return response
+
+        requests.Session.send = traced_send
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1000000
+
+    def _add(self, event):
+        thread_id = threading.get_ident()
+        event["pid"] = os.getpid()
+        event["tid"] = thread_id
+        with self._lock:
+            self._threads.setdefault(thread_id, threading.current_thread().name)
+            self._events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        """记录一个区间，yield 出的 args 可以在区间内补充字节数等信息"""
+        if not self.enabled:
+            yield args
+            return
+        start = self._now()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            self._add({"name": name, "cat": category, "ph": "X", "ts": start, "dur": self._now() - start,
+                       "args": args})
+
+    def begin(self, name, category, **args):
+        if self.enabled:
+            self._add({"name": name, "cat": category, "ph": "B", "ts": self._now(), "args": args})
+
+    def end(self, name, category, **args):
+        if self.enabled:
+            self._add({"name": name, "cat": category, "ph": "E", "ts": self._now(), "args": args})
+
+    def instant(self, name, category, **args):
+        if self.enabled:
+            self._add({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self._now(), "args": args})
+
+    def phase(self, name):
+        """阶段之间通过信号跳转，开始新阶段时结束上一个阶段"""
+        if not self.enabled:
+            return
+        now = self._now()
+        with self._lock:
+            previous, self._phase = self._phase, (name, now) if name else None
+            if previous:
+                self._phase_durations[previous[0]] = self._phase_durations.get(previous[0], 0) + now - previous[1]
+        if previous:
+            self._add({"name": previous[0], "cat": "phase", "ph": "X", "ts": previous[1], "dur": now - previous[1],
+                       "args": {}})
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self.phase(None)
+        self.enabled = False
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+            durations = dict(self._phase_durations)
+        events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread_id, "args": {"name": name}}
+                   for thread_id, name in threads.items()]
+        trace_path = os.path.join(get_resource_path("logs"), f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            os.makedirs(os.path.dirname(trace_path), exist_ok=True)
+            with open(trace_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+            log(f"Trace written to: {trace_path}")
+        except Exception as e:
+            log(f"Error writing trace: {e}")
+        log(f"Trace summary: total={self._now() / 1000000:.3f}s "
+            + " ".join(f"{name}={duration / 1000000:.3f}s" for name, duration in durations.items()))
+
+
+tracer = Tracer()
+
+
 def create_tmp_folder():
     try:
         tmp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp")
@@ -273,8 +753,8 @@ def clean_tmp_folder(tmp_dir):
 
 def show_error_message(title, message):
     log(f"ERROR: {title} - {message}")
-    msg_box = QMessageBox()
-    msg_box.setIcon(QMessageBox.Critical)
+    msg_box = QtWidgets.QMessageBox()
+    msg_box.setIcon(QtWidgets.QMessageBox.Critical)
     msg_box.setWindowTitle(title)
     msg_box.setText(message)
     msg_box.exec()
@@ -282,8 +762,8 @@ def show_error_message(title, message):
 
 def show_info_message(title, message):
     log(f"INFO: {title} - {message}")
-    msg_box = QMessageBox()
-    msg_box.setIcon(QMessageBox.Information)
+    msg_box = QtWidgets.QMessageBox()
+    msg_box.setIcon(QtWidgets.QMessageBox.Information)
     msg_box.setWindowTitle(title)
     msg_box.setText(message)
     msg_box.exec()
@@ -291,12 +771,12 @@ def show_info_message(title, message):
 
 def ask_question(title, question):
     log(f"QUESTION: {title} - {question}")
-    msg_box = QMessageBox()
-    msg_box.setIcon(QMessageBox.Question)
+    msg_box = QtWidgets.QMessageBox()
+    msg_box.setIcon(QtWidgets.QMessageBox.Question)
     msg_box.setWindowTitle(title)
     msg_box.setText(question)
-    msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-    msg_box.setDefaultButton(QMessageBox.Yes)
+    msg_box.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+    msg_box.setDefaultButton(QtWidgets.QMessageBox.Yes)
     return msg_box.exec()
 
 
@@ -329,6 +809,1194 @@ def copy_with_ignore(src, dst, ignored_folders=None):
             shutil.copy2(s, d)
 
 
+def get_partial_download_path(url):
+    # 未完成的下载放在 tmp 之外，出错退出和重启后仍可续传
+    folder = get_resource_path(PARTIAL_DOWNLOAD_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+
+def write_json_atomic(path, data, durable=False):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        if durable:
+            # 断电时也不会留下只写了一半的文件
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def discard_partial_download(part_path):
+    for path in (part_path, part_path + ".json"):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            log(f"Error removing partial download {path}: {e}")
+
+
+def clean_partial_downloads(max_age=PARTIAL_DOWNLOAD_MAX_AGE):
+    folder = get_resource_path(PARTIAL_DOWNLOAD_FOLDER)
+    if not os.path.isdir(folder):
+        return
+    now = time.time()
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if name.endswith(".part") and now - os.path.getmtime(path) > max_age:
+                log(f"Removing stale partial download: {path}")
+                discard_partial_download(path)
+        except Exception as e:
+            log(f"Error checking partial download {path}: {e}")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def link_or_copy(src, dst):
+    # 同一分区时用硬链接，避免再复制一遍数据
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class DownloadCache:
+    """按 URL+ETag 和 sha256 索引的持久下载缓存，超出大小限制时按 LRU 淘汰"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, folder=None, max_size=None):
+        self.folder = folder or get_resource_path(DOWNLOAD_CACHE_FOLDER)
+        self.objects_dir = os.path.join(self.folder, "objects")
+        self.index_path = os.path.join(self.folder, "index.json")
+        self.max_size = get_cache_max_size() if max_size is None else max_size
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                log(f"Error loading download cache index: {e}")
+        return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.folder, exist_ok=True)
+        write_json_atomic(self.index_path, index)
+
+    def _object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256)
+
+    def _find(self, index, url=None, sha256=None):
+        matches = [
+            (key, entry) for key, entry in index.items()
+            if (sha256 and entry["sha256"] == sha256) or (not sha256 and url and entry["url"] == url)
+        ]
+        # 同一 URL 缓存了多个 ETag 时取最新的
+        return max(matches, key=lambda item: item[1]["created"], default=(None, None))
+
+    def fetch(self, save_path, url=None, sha256=None):
+        """命中时把缓存文件放到 save_path 并返回 True"""
+        if self.max_size <= 0:
+            return False
+        with self._lock:
+            index = self._load_index()
+            key, entry = self._find(index, url, sha256)
+            if entry is None:
+                return False
+            object_path = self._object_path(entry["sha256"])
+            if not os.path.exists(object_path) or os.path.getsize(object_path) != entry["size"]:
+                log(f"Download cache entry is damaged, dropping: {key}")
+                del index[key]
+                self._save_index(index)
+                return False
+            entry["last_used"] = time.time()
+            self._save_index(index)
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        link_or_copy(object_path, save_path)
+        log(f"Download cache hit: {entry['url']} ({entry['sha256']})")
+        return True
+
+    def store(self, path, url, etag=None, last_modified=None, sha256=None):
+        if self.max_size <= 0:
+            return None
+        sha256 = sha256 or file_sha256(path)
+        size = os.path.getsize(path)
+        if size > self.max_size:
+            log(f"File too large for download cache ({size} bytes): {url}")
+            return sha256
+        with self._lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            object_path = self._object_path(sha256)
+            if not os.path.exists(object_path):
+                tmp_path = object_path + ".tmp"
+                link_or_copy(path, tmp_path)
+                os.replace(tmp_path, object_path)
+            index = self._load_index()
+            now = time.time()
+            index[f"{url}|{etag or ''}"] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256,
+                "size": size,
+                "created": now,
+                "last_used": now,
+            }
+            self._evict(index, self.max_size)
+            self._save_index(index)
+        log(f"Stored in download cache: {url} ({sha256})")
+        return sha256
+
+    def _evict(self, index, max_size):
+        blobs = {}
+        for entry in index.values():
+            blob = blobs.setdefault(entry["sha256"], {"size": entry["size"], "last_used": 0})
+            blob["last_used"] = max(blob["last_used"], entry["last_used"])
+        total = sum(blob["size"] for blob in blobs.values())
+        for sha256, blob in sorted(blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= max_size:
+                break
+            log(f"Evicting from download cache: {sha256}")
+            self._remove_blob(index, sha256)
+            total -= blob["size"]
+
+    def _remove_blob(self, index, sha256):
+        for key in [key for key, entry in index.items() if entry["sha256"] == sha256]:
+            del index[key]
+        try:
+            object_path = self._object_path(sha256)
+            if os.path.exists(object_path):
+                os.remove(object_path)
+        except Exception as e:
+            log(f"Error removing cached file {sha256}: {e}")
+
+    def list_entries(self):
+        with self._lock:
+            index = self._load_index()
+        return sorted(index.values(), key=lambda entry: entry["last_used"], reverse=True)
+
+    def total_size(self):
+        return sum({entry["sha256"]: entry["size"] for entry in self.list_entries()}.values())
+
+    def verify(self):
+        """重新计算所有缓存文件的 sha256，删除损坏的条目并返回其 sha256 列表"""
+        with self._lock:
+            index = self._load_index()
+            damaged = []
+            for sha256 in {entry["sha256"] for entry in index.values()}:
+                object_path = self._object_path(sha256)
+                if not os.path.exists(object_path) or file_sha256(object_path) != sha256:
+                    log(f"Download cache entry failed verification: {sha256}")
+                    damaged.append(sha256)
+                    self._remove_blob(index, sha256)
+            self._save_index(index)
+        return damaged
+
+    def purge(self, url=None):
+        """删除指定 URL 的缓存，不指定时清空整个缓存"""
+        with self._lock:
+            index = self._load_index()
+            for key in [key for key, entry in index.items() if url is None or entry["url"] == url]:
+                del index[key]
+            referenced = {entry["sha256"] for entry in index.values()}
+            if os.path.isdir(self.objects_dir):
+                for name in os.listdir(self.objects_dir):
+                    if name not in referenced:
+                        self._remove_blob(index, name)
+            self._save_index(index)
+
+    def trim(self, max_size=None):
+        with self._lock:
+            index = self._load_index()
+            self._evict(index, self.max_size if max_size is None else max_size)
+            self._save_index(index)
+
+
+class MetadataCache:
+    """服务器数据、发布信息等 JSON 的磁盘缓存，按 URL 保存内容及 ETag/Last-Modified 用于条件请求"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.path.join(os.path.dirname(config_store.path), METADATA_CACHE_NAME)
+        self.ttl = get_metadata_cache_ttl() if ttl is None else ttl
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                log(f"Error loading metadata cache: {e}")
+        return {}
+
+    def _save(self, entries):
+        try:
+            write_json_atomic(self.path, entries)
+        except Exception as e:
+            log(f"Error saving metadata cache: {e}")
+
+    def headers(self, url):
+        with self._lock:
+            entry = self._load().get(url)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, data, etag=None, last_modified=None):
+        with self._lock:
+            entries = self._load()
+            entries[url] = {"etag": etag, "last_modified": last_modified, "fetched": time.time(), "data": data}
+            self._save(entries)
+
+    def revalidated(self, url):
+        """服务器返回 304 时刷新获取时间并返回缓存的内容"""
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(url)
+            if entry is None:
+                return None
+            entry["fetched"] = time.time()
+            self._save(entries)
+        return entry["data"]
+
+    def newest(self, urls, is_valid=None, max_age=None):
+        """返回这些地址中最近获取的有效 (url, JSON)，max_age 限制缓存的最大年龄"""
+        with self._lock:
+            entries = self._load()
+        now = time.time()
+        matches = [
+            (url, entries[url]) for url in urls
+            if url in entries and (max_age is None or now - entries[url]["fetched"] <= max_age)
+            and (is_valid is None or is_valid(entries[url]["data"]))
+        ]
+        url, entry = max(matches, key=lambda item: item[1]["fetched"], default=(None, None))
+        return url, entry and entry["data"]
+
+
+class Wheelhouse:
+    """保留安装时 pip 下载的包，按最近几次的 requirements 集合记录引用，清理不再被引用的包"""
+
+    _lock = threading.Lock()
+    _file_pattern = re.compile(r"([^\s/\\=]+\.(?:whl|tar\.gz|zip))\b")
+
+    def __init__(self, folder=None, keep_sets=WHEELHOUSE_KEEP_SETS):
+        self.folder = folder or get_resource_path(WHEELHOUSE_FOLDER)
+        self.index_path = os.path.join(self.folder, "index.json")
+        self.keep_sets = keep_sets
+
+    @staticmethod
+    def requirements_hash(lines):
+        return hashlib.sha256("\n".join(sorted(lines)).encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                log(f"Error loading wheelhouse index: {e}")
+        return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.folder, exist_ok=True)
+        write_json_atomic(self.index_path, index)
+
+    def files_for(self, requirements_hash):
+        with self._lock:
+            entry = self._load_index().get(requirements_hash)
+        return set(entry["files"]) if entry else set()
+
+    def covers(self, requirements_hash):
+        """该 requirements 集合之前完整安装过，且用到的包都还在"""
+        with self._lock:
+            entry = self._load_index().get(requirements_hash)
+        return bool(entry) and all(os.path.exists(os.path.join(self.folder, name)) for name in entry["files"])
+
+    def files_in_output(self, output_lines):
+        # pip 输出 "Saved ./wheelhouse/x.whl"、"File was already downloaded ..."、"Processing ..."，
+        # 源码包构建出的 wheel 输出 "Created wheel for x: filename=x.whl ..."
+        names = set()
+        for line in output_lines:
+            for name in self._file_pattern.findall(line):
+                if os.path.exists(os.path.join(self.folder, name)):
+                    names.add(name)
+        return names
+
+    def record(self, requirements_hash, files):
+        with self._lock:
+            index = self._load_index()
+            index[requirements_hash] = {"files": sorted(files), "used": time.time()}
+            self._save_index(index)
+        self.prune()
+
+    def list_files(self):
+        if not os.path.isdir(self.folder):
+            return []
+        return [name for name in os.listdir(self.folder)
+                if name != "index.json" and os.path.isfile(os.path.join(self.folder, name))]
+
+    def total_size(self):
+        return sum(os.path.getsize(os.path.join(self.folder, name)) for name in self.list_files())
+
+    def prune(self):
+        """只保留最近 keep_sets 个 requirements 集合，删除没有被它们引用的包，返回释放的字节数"""
+        with self._lock:
+            index = self._load_index()
+            recent = sorted(index.items(), key=lambda item: item[1]["used"], reverse=True)[:self.keep_sets]
+            index = dict(recent)
+            referenced = {name for entry in index.values() for name in entry["files"]}
+            freed = 0
+            for name in self.list_files():
+                if name not in referenced:
+                    path = os.path.join(self.folder, name)
+                    try:
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                        freed += size
+                    except Exception as e:
+                        log(f"Error removing wheel {name}: {e}")
+            self._save_index(index)
+        if freed:
+            log(f"Pruned {freed / (1024 * 1024):.1f} MB of unreferenced wheels")
+        return freed
+
+
+class VenvSnapshots:
+    """安装成功后把 venv 打包保存，requirements、Python 版本和模块替换都相同时直接恢复，不再运行 pip"""
+
+    _lock = threading.Lock()
+    info_name = ".exvr_snapshot.json"
+
+    def __init__(self, folder=None, keep=VENV_SNAPSHOT_KEEP):
+        self.folder = folder or get_resource_path(VENV_SNAPSHOT_FOLDER)
+        self.keep = keep
+
+    @staticmethod
+    def make_key(requirements_file, modules_path, interpreter_version):
+        digest = hashlib.sha256()
+        with open(requirements_file, "rb") as f:
+            digest.update(f.read())
+        digest.update(f"{interpreter_version}|{LAU_VERSION}|{json.dumps(LAU_MAPPING, sort_keys=True)}".encode("utf-8"))
+        for source in sorted(LAU_MAPPING):
+            source_path = os.path.join(modules_path, source)
+            if os.path.exists(source_path):
+                digest.update(f"{source}:{file_sha256(source_path)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.zip")
+
+    def has(self, key):
+        return os.path.exists(self._path(key))
+
+    def create(self, key, venv_path):
+        os.makedirs(self.folder, exist_ok=True)
+        temp_path = self._path(key) + ".tmp"
+        # 不压缩：wheel 里的文件大多已经压缩过，打包和恢复都只受磁盘速度限制；
+        # 保留 __pycache__，恢复后第一次启动不必重新编译
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as zip_ref:
+            zip_ref.writestr(self.info_name, json.dumps({"venv_path": venv_path, "created": time.time()}))
+            for root, dirs, files in os.walk(venv_path):
+                for name in files:
+                    path = os.path.join(root, name)
+                    zip_ref.write(path, os.path.relpath(path, venv_path).replace(os.sep, "/"))
+        with self._lock:
+            os.replace(temp_path, self._path(key))
+            self.prune()
+        log(f"Saved venv snapshot {key[:12]} ({os.path.getsize(self._path(key)) / (1024 * 1024):.1f} MB)")
+
+    def restore(self, key, venv_path, python_path=None, index_urls=(), find_links=None):
+        """解压到临时目录并修正 pyvenv.cfg，替换原 venv 后在需要时重建启动器，失败时恢复原 venv"""
+        temp_path = venv_path + ".exvr-restore"
+        old_path = venv_path + ".exvr-old"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        with zipfile.ZipFile(self._path(key), "r") as zip_ref:
+            info = json.loads(zip_ref.read(self.info_name))
+            members = [member for member in zip_ref.infolist() if member.filename != self.info_name]
+            zip_ref.extractall(temp_path, members)
+            for member in members:
+                # zipfile 解压不保留权限，非 Windows 下脚本需要可执行位
+                mode = member.external_attr >> 16
+                if mode and not member.is_dir():
+                    os.chmod(os.path.join(temp_path, member.filename), mode & 0o7777)
+        base_python, changed = self._relocate(temp_path, info["venv_path"], venv_path, python_path)
+
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(venv_path):
+            os.replace(venv_path, old_path)
+        os.replace(temp_path, venv_path)
+        try:
+            if changed or info["venv_path"] != venv_path:
+                self._recreate_launchers(venv_path, base_python, index_urls, find_links)
+        except Exception:
+            shutil.rmtree(venv_path, ignore_errors=True)
+            if os.path.exists(old_path):
+                os.replace(old_path, venv_path)
+            raise
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.utime(self._path(key))
+        log(f"Restored venv snapshot {key[:12]} to {venv_path}")
+
+    @staticmethod
+    def _relocate(venv_path, old_venv_path, new_venv_path, python_path):
+        """改写 pyvenv.cfg 中创建时的绝对路径，返回 (基础解释器路径, 解释器是否变化)"""
+        base_python = python_path
+        changed = False
+        config_path = os.path.join(venv_path, "pyvenv.cfg")
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            for i, line in enumerate(lines):
+                key, _, value = line.partition("=")
+                if key.strip() == "home":
+                    if python_path and os.path.normcase(value.strip()) != os.path.normcase(os.path.dirname(python_path)):
+                        lines[i] = f"home = {os.path.dirname(python_path)}"
+                        changed = True
+                    elif not python_path:
+                        base_python = os.path.join(value.strip(), "python.exe")
+                elif python_path and key.strip() == "executable":
+                    lines[i] = f"executable = {python_path}"
+                else:
+                    lines[i] = line.replace(old_venv_path, new_venv_path)
+            with open(config_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        return base_python, changed
+
+    @staticmethod
+    def _recreate_launchers(venv_path, base_python, index_urls, find_links):
+        # Scripts 下的启动器 exe 里写着创建时的绝对路径，不直接改二进制：
+        # venv --upgrade 重建 python.exe 和 activate 脚本，重新安装同版本的 pip 重建 pip.exe
+        def run(cmd):
+            with tracer.span(f"venv relocate {cmd[2]}", "subprocess"):
+                return subprocess.run(cmd, capture_output=True, text=True,
+                                      creationflags=subprocess.CREATE_NO_WINDOW)
+
+        if not base_python or not os.path.exists(base_python):
+            raise FileNotFoundError(f"Base Python not found: {base_python}")
+        result = run([base_python, "-m", "venv", "--upgrade", venv_path])
+        if result.returncode != 0:
+            raise Exception(f"venv --upgrade failed: {(result.stdout + result.stderr).strip()[-500:]}")
+
+        version = read_installed_distributions(get_site_packages_dirs(venv_path)).get("pip")
+        cmd = [os.path.join(venv_path, "Scripts", "python.exe"), "-m", "pip", "install",
+               "--force-reinstall", "--no-deps", "--disable-pip-version-check"]
+        if find_links:
+            cmd += ["--find-links", find_links]
+        cmd.append(f"pip=={version}" if version else "pip")
+        for index_url in list(index_urls) or [None]:
+            result = run(cmd + (["-i", index_url] if index_url else []))
+            if result.returncode == 0:
+                return
+        raise Exception(f"Reinstalling pip failed: {(result.stdout + result.stderr).strip()[-500:]}")
+
+    def prune(self):
+        if not os.path.isdir(self.folder):
+            return
+        snapshots = sorted((os.path.join(self.folder, name) for name in os.listdir(self.folder)
+                            if name.endswith(".zip")), key=os.path.getmtime, reverse=True)
+        for path in snapshots[self.keep:]:
+            try:
+                os.remove(path)
+            except Exception as e:
+                log(f"Error removing venv snapshot {path}: {e}")
+
+
+class PipTelemetry:
+    """解析 pip 的输出和 --report，记录每个包的大小以及下载、构建、安装耗时，并按字节计算进度"""
+
+    _collecting_pattern = re.compile(r"^Collecting ([A-Za-z0-9][A-Za-z0-9._-]*)")
+    _downloading_pattern = re.compile(r"^Downloading (\S+) \(([\d.]+) (bytes|kB|MB|GB)\)$")
+    _file_pattern = re.compile(r"^(Using cached|File was already downloaded|Saved|Processing) (.+?\.(?:whl|tar\.gz|zip))"
+                               r"(?: \(([\d.]+) (bytes|kB|MB|GB)\))?$")
+    _raw_progress_pattern = re.compile(r"^Progress (\d+) of (\d+)$")
+    _build_pattern = re.compile(r"^Building wheel for (\S+) ")
+    _built_pattern = re.compile(r"^Created wheel for ([^:]+):")
+    _installing_pattern = re.compile(r"^Installing collected packages: (.+)$")
+    _size_units = {"bytes": 1, "kB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3}
+
+    def __init__(self, folder=None, tail_lines=PIP_OUTPUT_TAIL_LINES):
+        self.folder = folder
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.packages = {}
+        self.files = set()
+        self.expected = None
+        self._lock = threading.Lock()
+        self._current = None
+        self._install_order = []
+        self._install_started = None
+        self._installed = set()
+
+    @classmethod
+    def parse_size(cls, number, unit):
+        return int(float(number) * cls._size_units[unit])
+
+    @staticmethod
+    def name_from_file(path):
+        filename = unquote(re.split(r"[\\/]", urlsplit(path).path if "://" in path else path)[-1])
+        if filename.endswith(".whl"):
+            return normalize_package_name(filename.split("-")[0])
+        for extension in (".tar.gz", ".zip"):
+            if filename.endswith(extension):
+                return normalize_package_name(filename[:-len(extension)].rsplit("-", 1)[0])
+        return None
+
+    def _entry(self, name):
+        name = normalize_package_name(name)
+        if name not in self.packages:
+            self.packages[name] = {"name": name, "version": None, "size": None, "done": 0,
+                                   "download": 0.0, "build": 0.0, "install": 0.0}
+        return self.packages[name]
+
+    def load_report(self, report, sizes=None):
+        """pip install --report 的结果作为本次下载和安装的完整包集合"""
+        with self._lock:
+            self.expected = set()
+            for item in report.get("install", []):
+                metadata = item.get("metadata", {})
+                if not metadata.get("name"):
+                    continue
+                entry = self._entry(metadata["name"])
+                entry["version"] = metadata.get("version")
+                url = item.get("download_info", {}).get("url")
+                if sizes and url in sizes:
+                    entry["size"] = sizes[url]
+                self.expected.add(entry["name"])
+
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        now = time.time()
+        with self._lock:
+            self.tail.append(line)
+            match = self._raw_progress_pattern.match(line)
+            if match:
+                if self._current and self._current[1] == "download":
+                    entry = self.packages[self._current[0]]
+                    entry["done"], entry["size"] = int(match.group(1)), int(match.group(2))
+                return
+            match = self._collecting_pattern.match(line)
+            if match:
+                self._begin(self._entry(match.group(1))["name"], "download", now)
+                return
+            match = self._downloading_pattern.match(line)
+            if match:
+                if match.group(1).endswith(".metadata"):
+                    return
+                name = self.name_from_file(match.group(1)) or (self._current and self._current[0])
+                if name:
+                    entry = self._entry(name)
+                    if not entry["size"]:
+                        entry["size"] = self.parse_size(match.group(2), match.group(3))
+                    if not self._current or self._current[:2] != (entry["name"], "download"):
+                        self._begin(entry["name"], "download", now)
+                return
+            match = self._file_pattern.match(line)
+            if match:
+                self._file_seen(match.group(1), match.group(2), match.group(3), match.group(4))
+                return
+            if line.startswith("Preparing metadata") and self._current:
+                self._begin(self._current[0], "build", now)
+                return
+            match = self._build_pattern.match(line)
+            if match:
+                self._begin(self._entry(match.group(1))["name"], "build", now)
+                return
+            match = self._built_pattern.match(line)
+            if match:
+                self._begin(None, None, now)
+                return
+            match = self._installing_pattern.match(line)
+            if match:
+                self._begin(None, None, now)
+                self._install_order = [normalize_package_name(name.strip()) for name in match.group(1).split(",")]
+                self._install_started = now
+                for name in self._install_order:
+                    self._entry(name)
+
+    def _file_seen(self, action, path, number, unit):
+        name = self.name_from_file(path)
+        if not name:
+            return
+        entry = self._entry(name)
+        filename = re.split(r"[\\/]", path)[-1]
+        self.files.add(filename)
+        for candidate in (path, os.path.join(self.folder, filename) if self.folder else None):
+            if candidate and os.path.isfile(candidate):
+                entry["size"] = os.path.getsize(candidate)
+                break
+        else:
+            if number and not entry["size"]:
+                entry["size"] = self.parse_size(number, unit)
+        if action != "Processing":
+            entry["done"] = entry["size"] or 0
+
+    def _begin(self, name, phase, now):
+        if self._current:
+            current_name, current_phase, started = self._current
+            entry = self.packages[current_name]
+            entry[current_phase] += now - started
+            if current_phase == "download" and entry["size"]:
+                entry["done"] = entry["size"]
+        self._current = (name, phase, now) if name else None
+
+    def _installed_records(self, site_packages_dirs):
+        # pip 每装完一个包最后写入 dist-info/RECORD，按它的修改时间判断完成顺序
+        records = {}
+        for site_packages in site_packages_dirs:
+            try:
+                entries = os.listdir(site_packages)
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.endswith(".dist-info"):
+                    continue
+                name = normalize_package_name(entry[:-len(".dist-info")].rsplit("-", 1)[0])
+                if name not in self._install_order:
+                    continue
+                try:
+                    mtime = os.path.getmtime(os.path.join(site_packages, entry, "RECORD"))
+                except OSError:
+                    continue
+                if mtime >= self._install_started - 1:
+                    records[name] = mtime
+        return records
+
+    def poll_installed(self, site_packages_dirs):
+        if not self._install_started:
+            return False
+        installed = set(self._installed_records(site_packages_dirs))
+        with self._lock:
+            changed = installed != self._installed
+            self._installed = installed
+        return changed
+
+    def finish(self, site_packages_dirs=None):
+        with self._lock:
+            self._begin(None, None, time.time())
+            if not self._install_started or site_packages_dirs is None:
+                return
+            previous = self._install_started
+            for name, mtime in sorted(self._installed_records(site_packages_dirs).items(), key=lambda item: item[1]):
+                self.packages[name]["install"] = max(mtime - previous, 0.0)
+                previous = mtime
+
+    def _weighted(self, names, done):
+        sizes = [self.packages[name]["size"] for name in names if self.packages[name]["size"]]
+        fallback = sum(sizes) / len(sizes) if sizes else 1
+        total = completed = 0
+        for name in names:
+            size = self.packages[name]["size"] or fallback
+            total += size
+            completed += min(done(self.packages[name], size), size)
+        return completed / total if total else 0.0
+
+    def fraction(self):
+        """安装阶段按已装完的包的字节数计算，下载阶段按已下载字节数计算"""
+        with self._lock:
+            if self._install_order:
+                return self._weighted(self._install_order,
+                                      lambda entry, size: size if entry["name"] in self._installed else 0)
+            names = self.expected if self.expected is not None else list(self.packages)
+            return self._weighted(names, lambda entry, size: entry["done"])
+
+    def summary_lines(self):
+        with self._lock:
+            entries = [entry for entry in self.packages.values()
+                       if entry["download"] or entry["build"] or entry["install"] or entry["size"]]
+        entries.sort(key=lambda entry: entry["download"] + entry["build"] + entry["install"], reverse=True)
+        lines = [f"Pip package timings for {len(entries)} packages "
+                 f"({sum(entry['size'] or 0 for entry in entries) / (1024 * 1024):.1f} MB), slowest first:"]
+        for entry in entries:
+            lines.append(f"  {entry['name']} {entry['version'] or ''}".rstrip()
+                         + f": {(entry['size'] or 0) / (1024 * 1024):.2f} MB, download {entry['download']:.1f}s, "
+                           f"build {entry['build']:.1f}s, install {entry['install']:.1f}s")
+        return lines
+
+
+def get_content_range_total(response):
+    # 从 "bytes 0-0/12345" 中取出文件总大小
+    content_range = response.headers.get("content-range", "")
+    if content_range:
+        total = content_range.rsplit("/", 1)[-1].strip()
+        return int(total) if total.isdigit() else 0
+    return int(response.headers.get("content-length", 0))
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def get_release_root(names):
+    # GitHub zipball 里所有文件都在同一个顶层目录下
+    roots = {name.split("/", 1)[0] for name in names}
+    if len(roots) == 1 and all("/" in name for name in names):
+        return roots.pop() + "/"
+    return ""
+
+
+def is_ignored_path(relative_path, ignored_folders):
+    return any(part in ignored_folders for part in relative_path.split("/")[:-1])
+
+
+def safe_join_archive_path(base, name):
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or name.startswith("/") or ":" in name:
+        raise Exception(f"Unsafe path in archive: {name}")
+    return os.path.join(base, *parts)
+
+
+def load_release_manifest(final_path):
+    manifest_path = os.path.join(final_path, RELEASE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            log(f"Error loading release manifest: {e}")
+    return {}
+
+
+def write_release_manifest(final_path, files, source=None):
+    """记录本次安装的发布文件（大小、CRC32、修改时间）及其来源，用于增量更新、校验和修复"""
+    for relative_path, entry in files.items():
+        try:
+            entry["mtime_ns"] = os.stat(os.path.join(final_path, *relative_path.split("/"))).st_mtime_ns
+        except OSError:
+            entry.pop("mtime_ns", None)
+    write_json_atomic(os.path.join(final_path, RELEASE_MANIFEST_NAME),
+                      {"version": 2, "source": source, "files": files})
+
+
+def installed_file_matches(final_path, relative_path, files, crc32, size):
+    # 大小和修改时间与清单一致时直接信任清单里的 CRC，否则重新计算
+    try:
+        stat = os.stat(os.path.join(final_path, *relative_path.split("/")))
+    except OSError:
+        return False
+    if stat.st_size != size:
+        return False
+    entry = files.get(relative_path)
+    if entry and entry.get("size") == size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry.get("crc32") == crc32
+    return file_crc32(os.path.join(final_path, *relative_path.split("/"))) == crc32
+
+
+def get_release_staging_path(final_path):
+    # 与安装目录在同一分区，替换时只需要重命名
+    return os.path.normpath(final_path) + ".staging"
+
+
+def discard_release_staging(final_path):
+    staging_path = get_release_staging_path(final_path)
+    if os.path.exists(staging_path):
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+
+def prepare_release_staging(final_path):
+    """清理上次失败留下的暂存目录；替换到一半中断时先恢复旧目录，返回新的暂存目录"""
+    old_path = os.path.normpath(final_path) + ".old"
+    if os.path.exists(old_path):
+        if os.path.exists(final_path):
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            log(f"Restoring {final_path} from an interrupted release swap")
+            os.rename(old_path, final_path)
+    discard_release_staging(final_path)
+    staging_path = get_release_staging_path(final_path)
+    os.makedirs(staging_path)
+    return staging_path
+
+
+def carry_over_local_files(old_path, new_path, old_release_files, moved):
+    """把不属于发布包的文件和目录（用户数据、运行时生成的文件、__pycache__）从旧目录移动到新目录
+
+    新版本里没有、也不含旧发布文件的目录整个 os.replace 过去，只有新旧版本都有的目录才逐项处理；
+    旧清单里有、新版本已删除的发布文件不再保留。移动过的相对路径依次追加到 moved
+    """
+    release_dirs = set()
+    for relative_path in old_release_files:
+        parts = relative_path.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            release_dirs.add("/".join(parts[:i]))
+
+    def carry(relative_dir):
+        source_dir = os.path.join(old_path, *relative_dir.split("/")) if relative_dir else old_path
+        for name in os.listdir(source_dir):
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            if relative_path == RELEASE_MANIFEST_NAME or relative_path in old_release_files:
+                continue
+            source = os.path.join(source_dir, name)
+            target = os.path.join(new_path, *relative_path.split("/"))
+            is_dir = os.path.isdir(source) and not os.path.islink(source)
+            if os.path.lexists(target):
+                if is_dir and os.path.isdir(target):
+                    carry(relative_path)
+                continue
+            if is_dir and relative_path in release_dirs:
+                # 新版本删除的目录里还可能有用户文件，逐项处理
+                carry(relative_path)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(source, target)
+            moved.append(relative_path)
+
+    carry("")
+
+
+def swap_release_tree(final_path, old_release_files):
+    """核对通过后用暂存目录替换安装目录，任何一步失败都保留原来的安装目录"""
+    staging_path = get_release_staging_path(final_path)
+    old_path = os.path.normpath(final_path) + ".old"
+    moved = []
+
+    def move_back(root):
+        for relative_path in reversed(moved):
+            target = os.path.join(root, *relative_path.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(os.path.join(staging_path, *relative_path.split("/")), target)
+
+    if os.path.exists(final_path):
+        try:
+            carry_over_local_files(final_path, staging_path, old_release_files, moved)
+            os.rename(final_path, old_path)
+        except Exception:
+            move_back(final_path)
+            raise
+    try:
+        os.rename(staging_path, final_path)
+    except Exception:
+        if os.path.exists(old_path):
+            os.rename(old_path, final_path)
+            move_back(final_path)
+        raise
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def verify_installed_files(final_path, files, workers=EXTRACT_WORKERS, is_running=None, on_progress=None):
+    """并行重新计算所有已安装文件的 CRC32，返回缺失或损坏的相对路径"""
+    def check(relative_path, entry):
+        if is_running and not is_running():
+            return None
+        local_path = os.path.join(final_path, *relative_path.split("/"))
+        try:
+            if os.path.getsize(local_path) == entry["size"] and file_crc32(local_path) == entry["crc32"]:
+                return None
+        except OSError:
+            pass
+        return relative_path
+
+    mismatched = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {executor.submit(check, path, entry): entry for path, entry in files.items()}
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                mismatched.append(future.result())
+            if on_progress:
+                on_progress(futures[future]["size"])
+            if is_running and not is_running():
+                for pending in futures:
+                    pending.cancel()
+                break
+    return sorted(mismatched)
+
+
+def release_manifest_from_zip(zip_ref, ignored_folders):
+    infos = zip_ref.infolist()
+    root = get_release_root([info.filename for info in infos])
+    files = {}
+    for info in infos:
+        relative_path = info.filename[len(root):]
+        if not relative_path or info.is_dir() or is_ignored_path(relative_path, ignored_folders):
+            continue
+        files[relative_path] = {"size": info.file_size, "crc32": info.CRC}
+    return files
+
+
+def find_zip_central_directory(tail):
+    position = tail.rfind(b"PK\x05\x06")
+    if position < 0 or len(tail) - position < 22:
+        raise Exception("End of central directory not found")
+    _, _, _, _, entry_count, cd_size, cd_offset, _ = struct.unpack("<4s4H2LH", tail[position:position + 22])
+    if entry_count == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        raise Exception("ZIP64 archives are not supported for delta updates")
+    return cd_offset, cd_size
+
+
+def parse_zip_central_directory(data):
+    entries = []
+    position = 0
+    while position + 46 <= len(data) and data[position:position + 4] == b"PK\x01\x02":
+        (_, _, _, flags, method, _, _, crc, compressed_size, size,
+         name_length, extra_length, comment_length, _, _, _, offset) = struct.unpack(
+            "<4s6H3L5H2L", data[position:position + 46])
+        raw_name = data[position + 46:position + 46 + name_length]
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+        entries.append({
+            "name": name, "flags": flags, "method": method, "crc32": crc,
+            "compressed_size": compressed_size, "size": size, "offset": offset,
+        })
+        position += 46 + name_length + extra_length + comment_length
+    return entries
+
+
+def read_zip_entry(entry, blob):
+    """从包含本地文件头的字节中解出一个 ZIP 条目并校验 CRC"""
+    if blob[:4] != b"PK\x03\x04":
+        raise Exception(f"Bad local file header for {entry['name']}")
+    if entry["flags"] & 0x1:
+        raise Exception(f"Encrypted entry not supported: {entry['name']}")
+    name_length, extra_length = struct.unpack("<2H", blob[26:30])
+    start = 30 + name_length + extra_length
+    raw = blob[start:start + entry["compressed_size"]]
+    if entry["method"] == zipfile.ZIP_STORED:
+        data = raw
+    elif entry["method"] == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(raw, -15)
+    else:
+        raise Exception(f"Unsupported compression method {entry['method']} for {entry['name']}")
+    if zlib.crc32(data) != entry["crc32"]:
+        raise Exception(f"CRC mismatch for {entry['name']}")
+    return data
+
+
+def extract_members_parallel(zip_path, members, workers=EXTRACT_WORKERS, is_running=None, on_progress=None,
+                             is_unchanged=None):
+    """并行解压 (ZipInfo, 目标路径) 列表：每个线程使用自己的 ZipFile 句柄，大文件优先，返回是否全部完成"""
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract(info, target):
+        if is_running and not is_running():
+            return 0
+        if is_unchanged and is_unchanged(info, target):
+            return info.file_size
+        if not hasattr(local, "zip_ref"):
+            local.zip_ref = zipfile.ZipFile(zip_path, "r")
+            with handles_lock:
+                handles.append(local.zip_ref)
+        tmp_path = target + ".exvr-tmp"
+        with local.zip_ref.open(info) as source, open(tmp_path, "wb") as f:
+            shutil.copyfileobj(source, f, DOWNLOAD_CHUNK_SIZE)
+        os.replace(tmp_path, target)
+        return info.file_size
+
+    ordered = sorted(members, key=lambda member: member[0].file_size, reverse=True)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = [executor.submit(extract, info, target) for info, target in ordered]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    size = future.result()
+                except Exception:
+                    # 第一个失败就取消还没开始的解压，不再继续写入注定要丢弃的暂存目录
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                if on_progress:
+                    on_progress(size)
+                if is_running and not is_running():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return False
+    finally:
+        for handle in handles:
+            handle.close()
+    return not is_running or is_running()
+
+
+class StreamingZipExtractor:
+    """边下载边解压：按顺序解析本地文件头，去掉顶层目录后直接解压到 final_path，下载完成后再由中央目录核对"""
+
+    def __init__(self, final_path, ignored_folders=None):
+        self.final_path = final_path
+        self.ignored_folders = ignored_folders if ignored_folders else IGNORED_FOLDERS
+        self.extracted = {}
+        self.failed = None
+        self._queue = None
+        self._thread = None
+        self._buffer = bytearray()
+        self._eof = False
+        self._aborted = False
+
+    def reset(self):
+        self.abort()
+        self.extracted = {}
+        self.failed = None
+        self._root = None
+        self._buffer = bytearray()
+        self._eof = False
+        self._aborted = False
+        self._queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        if self._thread is not None and self.failed is None:
+            self._queue.put(bytes(data))
+
+    def finish(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def abort(self):
+        self._aborted = True
+        if self._thread is not None:
+            # 清空队列，确保结束标记能放进去
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            self._parse()
+        except EOFError:
+            pass
+        except Exception as e:
+            self.failed = str(e)
+            log(f"Streaming extraction stopped, remaining files will be extracted after download: {e}")
+        while not self._eof:
+            if self._queue.get() is None:
+                self._eof = True
+
+    def _fill(self):
+        if self._eof or self._aborted:
+            raise EOFError()
+        data = self._queue.get()
+        if data is None:
+            self._eof = True
+            raise EOFError()
+        self._buffer += data
+
+    def _read(self, size):
+        while len(self._buffer) < size:
+            self._fill()
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _read_some(self, size):
+        if not self._buffer:
+            self._fill()
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _parse(self):
+        while True:
+            signature = self._read(4)
+            if signature in (b"PK\x01\x02", b"PK\x05\x06"):
+                return
+            if signature != b"PK\x03\x04":
+                raise Exception("Unexpected data in archive stream")
+            _, flags, method, _, _, crc, compressed_size, size, name_length, extra_length = struct.unpack(
+                "<5H3L2H", self._read(26))
+            name = self._read(name_length).decode("utf-8" if flags & 0x800 else "cp437")
+            self._read(extra_length)
+            if flags & 0x1:
+                raise Exception(f"Encrypted entry: {name}")
+            has_descriptor = bool(flags & 0x8)
+            if method == zipfile.ZIP_STORED and has_descriptor and not name.endswith("/"):
+                raise Exception(f"Stored entry without sizes: {name}")
+            if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                raise Exception(f"Unsupported compression method {method}: {name}")
+            if compressed_size == 0xFFFFFFFF or size == 0xFFFFFFFF:
+                raise Exception(f"ZIP64 entry: {name}")
+
+            # zipball 的所有条目都在第一个条目所在的顶层目录下
+            if self._root is None:
+                self._root = name.split("/", 1)[0] + "/" if "/" in name else ""
+            if not name.startswith(self._root):
+                raise Exception(f"Entry outside the release root: {name}")
+            relative_path = name[len(self._root):]
+
+            if name.endswith("/"):
+                if relative_path and not is_ignored_path(relative_path.rstrip("/"), self.ignored_folders):
+                    os.makedirs(safe_join_archive_path(self.final_path, relative_path), exist_ok=True)
+                if method == zipfile.ZIP_STORED:
+                    # 目录没有数据，有数据描述符时它紧跟在文件头之后
+                    self._read(compressed_size)
+                    actual_crc, actual_size = 0, 0
+                else:
+                    # 流式写入的目录也带一个空的 deflate 数据块，和文件一样读完再读数据描述符
+                    actual_crc, actual_size = self._extract_data(None, method, compressed_size, has_descriptor)
+            elif is_ignored_path(relative_path, self.ignored_folders):
+                actual_crc, actual_size = self._extract_data(None, method, compressed_size, has_descriptor)
+            else:
+                target = safe_join_archive_path(self.final_path, relative_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_path = target + ".exvr-tmp"
+                with open(tmp_path, "wb") as f:
+                    actual_crc, actual_size = self._extract_data(f, method, compressed_size, has_descriptor)
+                os.replace(tmp_path, target)
+
+            if has_descriptor:
+                descriptor = self._read(4)
+                if descriptor == b"PK\x07\x08":
+                    descriptor = self._read(4)
+                crc = struct.unpack("<L", descriptor)[0]
+                compressed_size, size = struct.unpack("<2L", self._read(8))
+            if actual_crc != crc or actual_size != size:
+                raise Exception(f"CRC or size mismatch for {name}")
+            self.extracted[name] = (crc, size)
+
+    def _extract_data(self, f, method, compressed_size, has_descriptor):
+        crc, size = 0, 0
+        decompressor = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+        remaining = compressed_size
+        while has_descriptor or remaining > 0:
+            chunk = self._read_some(DOWNLOAD_CHUNK_SIZE if has_descriptor else min(remaining, DOWNLOAD_CHUNK_SIZE))
+            remaining -= len(chunk)
+            data = decompressor.decompress(chunk) if decompressor else chunk
+            if f:
+                f.write(data)
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            if decompressor and decompressor.eof:
+                # 数据描述符模式下，解压结束后多读的字节放回缓冲区
+                self._buffer[0:0] = decompressor.unused_data
+                break
+        if decompressor and not decompressor.eof:
+            data = decompressor.flush()
+            if f:
+                f.write(data)
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+        return crc, size
+
+
+def http_range_get(session, url, start, end):
+    response = session.get(url, headers={"Range": f"bytes={start}-{end - 1}"}, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    if response.status_code != 206 or len(response.content) != end - start:
+        raise Exception(f"Range request bytes={start}-{end - 1} failed with status {response.status_code}")
+    return response.content
+
+
 def quote_path_if_needed(path):
     if " " in path:
         return f'"{path}"'
@@ -348,24 +2016,25 @@ def is_admin():
         return False
 
 
-class CustomFileDialog(QDialog):
+class CustomFileDialog:
+    """选择安装路径的对话框，包装 QDialog 而不是继承它，定义这个类时不需要导入 PySide6"""
 
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Select installation path")
-        self.setMinimumSize(500, 400)
+        self.dialog = QtWidgets.QDialog(parent)
+        self.dialog.setWindowTitle("Select installation path")
+        self.dialog.setMinimumSize(500, 400)
         self.selected_path = ""
         self.initUI()
 
     def initUI(self):
-        layout = QVBoxLayout(self)
+        layout = QtWidgets.QVBoxLayout(self.dialog)
 
-        path_layout = QHBoxLayout()
-        path_label = QLabel("Installation path:")
-        self.path_edit = QLineEdit("C:\\")
+        path_layout = QtWidgets.QHBoxLayout()
+        path_label = QtWidgets.QLabel("Installation path:")
+        self.path_edit = QtWidgets.QLineEdit("C:\\")
         self.path_edit.textChanged.connect(self.validate_path)
 
-        self.drive_combo = QComboBox()
+        self.drive_combo = QtWidgets.QComboBox()
         self.populate_drives()
         self.drive_combo.currentIndexChanged.connect(self.drive_changed)
 
@@ -373,11 +2042,11 @@ class CustomFileDialog(QDialog):
         path_layout.addWidget(self.drive_combo)
         path_layout.addWidget(self.path_edit, 1)
 
-        self.model = QFileSystemModel()
-        self.model.setFilter(QDir.AllDirs | QDir.NoDotAndDotDot)
+        self.model = QtWidgets.QFileSystemModel()
+        self.model.setFilter(QtCore.QDir.AllDirs | QtCore.QDir.NoDotAndDotDot)
         self.model.setRootPath("C:\\")
 
-        self.tree = QTreeView()
+        self.tree = QtWidgets.QTreeView()
         self.tree.setModel(self.model)
         self.tree.setRootIndex(self.model.index("C:\\"))
         self.tree.setColumnWidth(0, 250)
@@ -386,16 +2055,16 @@ class CustomFileDialog(QDialog):
         for i in range(1, self.model.columnCount()):
             self.tree.hideColumn(i)
 
-        self.status_label = QLabel("")
+        self.status_label = QtWidgets.QLabel("")
         self.status_label.setStyleSheet("color: red;")
 
-        button_layout = QHBoxLayout()
-        self.ok_button = QPushButton("Choose")
-        self.ok_button.clicked.connect(self.accept)
+        button_layout = QtWidgets.QHBoxLayout()
+        self.ok_button = QtWidgets.QPushButton("Choose")
+        self.ok_button.clicked.connect(self.dialog.accept)
         self.ok_button.setEnabled(False)
 
-        cancel_button = QPushButton("Cancel")
-        cancel_button.clicked.connect(self.reject)
+        cancel_button = QtWidgets.QPushButton("Cancel")
+        cancel_button.clicked.connect(self.dialog.reject)
 
         button_layout.addWidget(self.status_label, 1)
         button_layout.addWidget(self.ok_button)
@@ -454,12 +2123,15 @@ class CustomFileDialog(QDialog):
         self.ok_button.setEnabled(True)
         self.selected_path = path
 
+    def exec(self):
+        return self.dialog.exec()
+
     def get_selected_path(self):
         return self.selected_path
 
 
 # --- Worker Threads ---
-class WorkerSignals(QObject):
+class WorkerSignals:
     progress = Signal(int)
     finished = Signal()
     error = Signal(str)
@@ -467,7 +2139,7 @@ class WorkerSignals(QObject):
     log = Signal(str)
 
 
-class PythonCheckWorker(QThread):
+class PythonCheckWorker(WorkerThread):
     def __init__(self):
         super().__init__()
         self.signals = WorkerSignals()
@@ -480,11 +2152,12 @@ class PythonCheckWorker(QThread):
     def _check_command(self, command):
         try:
             self.signals.log.emit(f"Executing: {' '.join(command)}")
-            result = subprocess.run(
-                command, capture_output=True, text=True,
-                timeout=PYTHON_CHECK_TIMEOUT, check=False,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            with tracer.span("python --version", "subprocess", command=command[0]):
+                result = subprocess.run(
+                    command, capture_output=True, text=True,
+                    timeout=PYTHON_CHECK_TIMEOUT, check=False,
+                    creationflags=subprocess.CREATE_NO_WINDOW
+                )
             if result.returncode == 0 and f"Python {PYTHON_VERSION}" in result.stdout:
                 self.signals.log.emit(f"Success: {result.stdout.strip()}")
                 return True
@@ -528,13 +2201,32 @@ class PythonCheckWorker(QThread):
             self.signals.error.emit(str(e))
 
 
-class DownloadWorker(QThread):
-    def __init__(self, url, save_path):
+class DownloadChangedError(Exception):
+    pass
+
+
+class DownloadWorker(WorkerThread):
+    def __init__(self, url, save_path, segments=DOWNLOAD_SEGMENTS, sha256=None, use_cache=True, pipeline=None):
         super().__init__()
         self.url = url
         self.save_path = save_path
+        self.segments = segments
+        self.sha256 = sha256
+        self.pipeline = pipeline
+        self.cache = DownloadCache() if use_cache else None
+        self.part_path = get_partial_download_path(url)
         self.signals = WorkerSignals()
         self._is_running = True
+        self._lock = threading.Lock()
+        self._ranges = []
+        self._pending = []
+        self._validators = {}
+        self._total_size = 0
+        self._downloaded = 0
+        self._fed = 0
+        self._last_progress = -1
+        self._segment_error = None
+        self._progressed = False
 
     def stop(self):
         self._is_running = False
@@ -542,40 +2234,354 @@ class DownloadWorker(QThread):
 
     def run(self):
         try:
-            self.signals.log.emit(f"Starting download: {self.url} to {self.save_path}")
-            response = requests.get(self.url, stream=True, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            total_size = int(response.headers.get("content-length", 0))
-            downloaded = 0
             os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
-            with open(self.save_path, "wb") as file:
-                for data in response.iter_content(chunk_size=8192):
-                    if not self._is_running:
-                        self.signals.log.emit("Download cancelled.")
-                        return
-                    file.write(data)
-                    downloaded += len(data)
-                    if total_size > 0:
-                        progress = int((downloaded / total_size) * 100)
-                        self.signals.progress.emit(progress)
+            if self.cache and self.cache.fetch(self.save_path, url=self.url, sha256=self.sha256):
+                self.signals.log.emit(f"Using cached download for {self.url}")
+                self.signals.progress.emit(100)
+                self.signals.result.emit(self.save_path)
+                self.signals.finished.emit()
+                return
+
+            self.signals.log.emit(f"Starting download: {self.url} to {self.save_path}")
+            attempt = 0
+            while True:
+                try:
+                    completed = self._attempt_download()
+                    break
+                except DownloadChangedError as e:
+                    self.signals.log.emit(f"{e}, discarding partial data")
+                    discard_partial_download(self.part_path)
+                    error = e
+                except Exception as e:
+                    if not self._is_retryable(e):
+                        raise
+                    error = e
+                if not self._is_running:
+                    completed = False
+                    break
+                if self._progressed:
+                    # 这次尝试保存了新的数据，重试次数和退避时间重新计算
+                    attempt = 0
+                attempt += 1
+                if attempt > DOWNLOAD_RETRIES:
+                    raise Exception(f"Download failed after {DOWNLOAD_RETRIES} retries: {error}")
+                delay = min(DOWNLOAD_BACKOFF_BASE * 2 ** (attempt - 1), DOWNLOAD_BACKOFF_MAX)
+                self.signals.log.emit(f"Download attempt {attempt} failed: {error}. Retrying in {delay}s...")
+                self._sleep(delay)
+
+            if not completed:
+                self.signals.log.emit("Download cancelled.")
+                if self.pipeline:
+                    self.pipeline.abort()
+                return
+
+            sha256 = file_sha256(self.part_path)
+            if self.sha256 and sha256 != self.sha256:
+                discard_partial_download(self.part_path)
+                raise Exception(f"Checksum mismatch for {self.url}: expected {self.sha256}, got {sha256}")
+            shutil.move(self.part_path, self.save_path)
+            discard_partial_download(self.part_path)
+            clean_partial_downloads()
+            if self.cache:
+                try:
+                    self.cache.store(self.save_path, self.url, self._validators.get("etag"),
+                                     self._validators.get("last_modified"), sha256)
+                except Exception as e:
+                    self.signals.log.emit(f"Error storing download in cache: {e}")
             self.signals.log.emit("Download finished.")
             self.signals.result.emit(self.save_path)
             self.signals.finished.emit()
 
         except Exception as e:
+            if self.pipeline:
+                self.pipeline.abort()
             self.signals.log.emit(f"Download error: {e}")
             self.signals.error.emit(str(e))
 
+    def _is_retryable(self, error):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status >= 500 or status in (408, 429)
+        return True
+
+    def _sleep(self, seconds):
+        deadline = time.time() + seconds
+        while self._is_running and time.time() < deadline:
+            time.sleep(0.1)
+
+    def _attempt_download(self):
+        self._segment_error = None
+        self._progressed = False
+        # 每次尝试都从头把已落盘的连续数据交给流水线解压
+        self._fed = 0
+        if self.pipeline:
+            self.pipeline.reset()
+        # 用 Range 探测服务器是否支持分段下载，不支持时直接复用该响应
+        response = requests.get(self.url, stream=True, timeout=REQUEST_TIMEOUT, headers={"Range": "bytes=0-0"})
+        response.raise_for_status()
+        self._total_size = get_content_range_total(response)
+        self._validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+
+        if response.status_code != 206 or self._total_size <= 0:
+            if response.status_code == 206:
+                response.close()
+                response = requests.get(self.url, stream=True, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+            discard_partial_download(self.part_path)
+            self.signals.log.emit("Ranges not supported, using single connection")
+            return self._download_single(response)
+
+        response.close()
+        ranges = self._load_partial_state()
+        if ranges is None:
+            with open(self.part_path, "wb") as file:
+                file.truncate(self._total_size)
+            segments = self.segments if self._total_size >= 2 * DOWNLOAD_MIN_SEGMENT_SIZE else 1
+            part_size = -(-self._total_size // segments)
+            ranges = [[start, min(start + part_size, self._total_size)]
+                      for start in range(0, self._total_size, part_size)]
+        self._ranges = ranges
+        self._downloaded = self._total_size - sum(end - start for start, end in ranges)
+        self.signals.log.emit(
+            f"Server accepts ranges, downloading {self._total_size - self._downloaded} of {self._total_size} bytes"
+            f" with up to {self.segments} connections")
+        return self._download_segmented(response.url)
+
+    def _load_partial_state(self):
+        state_path = self.part_path + ".json"
+        if not os.path.exists(state_path) or not os.path.exists(self.part_path):
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            self.signals.log.emit(f"Error reading partial download state: {e}")
+            discard_partial_download(self.part_path)
+            return None
+
+        etag, last_modified = self._validators["etag"], self._validators["last_modified"]
+        unchanged = (
+            state.get("url") == self.url
+            and state.get("total_size") == self._total_size
+            and os.path.getsize(self.part_path) == self._total_size
+            and (etag or last_modified)
+            and state.get("etag") == etag
+            and state.get("last_modified") == last_modified
+        )
+        if not unchanged:
+            self.signals.log.emit("Remote file changed since the partial download, starting over")
+            discard_partial_download(self.part_path)
+            return None
+        self.signals.log.emit(f"Resuming partial download: {state.get('committed', 0)} bytes already on disk")
+        return [list(r) for r in state.get("remaining", []) if r[0] < r[1]]
+
+    def _save_partial_state(self):
+        with self._lock:
+            remaining = [list(r) for r in self._ranges if r[0] < r[1]]
+        state = {
+            "url": self.url,
+            "etag": self._validators.get("etag"),
+            "last_modified": self._validators.get("last_modified"),
+            "total_size": self._total_size,
+            "committed": self._total_size - sum(end - start for start, end in remaining),
+            "remaining": remaining,
+        }
+        try:
+            write_json_atomic(self.part_path + ".json", state)
+        except Exception as e:
+            self.signals.log.emit(f"Error saving partial download state: {e}")
+
+    def _emit_progress(self, total_size):
+        if total_size <= 0:
+            return
+        progress = int((self._downloaded / total_size) * 100)
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.signals.progress.emit(progress)
+
+    def _download_single(self, response):
+        total_size = int(response.headers.get("content-length", 0))
+        self._downloaded = 0
+        with open(self.part_path, "wb") as file:
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if not self._is_running:
+                    return False
+                file.write(data)
+                if self.pipeline:
+                    self.pipeline.feed(data)
+                self._downloaded += len(data)
+                self._emit_progress(total_size)
+        if total_size and self._downloaded < total_size:
+            raise Exception(f"Connection closed early at byte {self._downloaded} of {total_size}")
+        return True
+
+    def _download_segmented(self, url):
+        self._pending = list(self._ranges)
+        thread_count = self.segments if self._total_size >= 2 * DOWNLOAD_MIN_SEGMENT_SIZE else 1
+        threads = [
+            threading.Thread(target=self._segment_loop, args=(url,), daemon=True)
+            for _ in range(max(thread_count, 1))
+        ]
+        for thread in threads:
+            thread.start()
+
+        resumed_from = self._downloaded
+        last_saved = time.time()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                self._emit_progress(self._total_size)
+                self._feed_pipeline()
+                if time.time() - last_saved >= 1:
+                    self._save_partial_state()
+                    last_saved = time.time()
+                time.sleep(0.1)
+        finally:
+            self._save_partial_state()
+            self._progressed = self._downloaded > resumed_from
+
+        if self._segment_error is not None:
+            raise self._segment_error
+        if not self._is_running:
+            return False
+        if any(start < end for start, end in self._ranges):
+            raise Exception("Download finished with missing byte ranges")
+        self._feed_pipeline()
+        self._emit_progress(self._total_size)
+        return True
+
+    def _feed_pipeline(self):
+        # 只把文件开头已连续写完的部分交给流水线
+        if not self.pipeline:
+            return
+        with self._lock:
+            watermark = min((start for start, end in self._ranges if start < end), default=self._total_size)
+        if watermark <= self._fed:
+            return
+        with open(self.part_path, "rb") as file:
+            file.seek(self._fed)
+            while self._fed < watermark:
+                data = file.read(min(DOWNLOAD_CHUNK_SIZE, watermark - self._fed))
+                if not data:
+                    break
+                self.pipeline.feed(data)
+                self._fed += len(data)
+
+    def _segment_loop(self, url):
+        session = requests.Session()
+        try:
+            segment = self._next_segment()
+            attempt = 0
+            while segment is not None and self._is_running and self._segment_error is None:
+                position = segment[0]
+                try:
+                    with tracer.span("download segment", "network", start=position) as trace_args:
+                        try:
+                            self._fetch_segment(session, url, segment)
+                        finally:
+                            trace_args["bytes"] = segment[0] - position
+                except DownloadChangedError:
+                    raise
+                except Exception as e:
+                    if not self._is_retryable(e):
+                        raise
+                    # 失败只重试这一段，其他段继续下载；这一段有进展时重新计数
+                    attempt = 0 if segment[0] > position else attempt + 1
+                    if attempt > DOWNLOAD_RETRIES:
+                        raise Exception(f"Segment at byte {segment[0]} failed after {DOWNLOAD_RETRIES} retries: {e}")
+                    delay = min(DOWNLOAD_BACKOFF_BASE * 2 ** max(attempt - 1, 0), DOWNLOAD_BACKOFF_MAX)
+                    self.signals.log.emit(f"Segment at byte {segment[0]} failed: {e}. Retrying in {delay}s...")
+                    self._sleep(delay)
+                    continue
+                attempt = 0
+                segment = self._next_segment()
+        except Exception as e:
+            with self._lock:
+                if self._segment_error is None:
+                    self._segment_error = e
+        finally:
+            session.close()
+
+    def _fetch_segment(self, session, url, segment):
+        with self._lock:
+            start, end = segment
+        if start >= end:
+            return
+
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        # 远端文件变化时 If-Range 使服务器返回 200 整个文件，据此丢弃旧数据
+        etag = self._validators.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["If-Range"] = etag
+        elif self._validators.get("last_modified"):
+            headers["If-Range"] = self._validators["last_modified"]
+
+        with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code == 200:
+                raise DownloadChangedError("Remote file changed during download")
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise Exception(f"Range request bytes={start}-{end - 1} returned status {response.status_code}")
+            # 无缓冲写入，保证保存到状态文件的进度都已真正写入磁盘
+            with open(self.part_path, "r+b", buffering=0) as file:
+                file.seek(start)
+                for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if not self._is_running or self._segment_error is not None:
+                        return
+                    with self._lock:
+                        position, end = segment
+                    data = data[:end - position]
+                    file.write(data)
+                    with self._lock:
+                        segment[0] = position + len(data)
+                        self._downloaded += len(data)
+                        done = segment[0] >= segment[1]
+                    if done:
+                        break
 
-class ExtractWorker(QThread):
-    def __init__(self, zip_path, extract_path, final_path=None, ignored_folders=None):
+        with self._lock:
+            if segment[0] < segment[1]:
+                raise Exception(f"Connection closed early at byte {segment[0]} of segment ending at {segment[1]}")
+
+    def _next_segment(self):
+        # 先领取未分配的段，再拆分剩余最多的段交给空闲线程，避免慢连接拖住整个下载
+        with self._lock:
+            if not self._is_running or self._segment_error is not None:
+                return None
+            if self._pending:
+                return self._pending.pop(0)
+            if not self._ranges:
+                return None
+            victim = max(self._ranges, key=lambda s: s[1] - s[0])
+            remaining = victim[1] - victim[0]
+            if remaining < 2 * DOWNLOAD_MIN_SEGMENT_SIZE:
+                return None
+            middle = victim[0] + remaining // 2
+            stolen = [middle, victim[1]]
+            victim[1] = middle
+            self._ranges.append(stolen)
+            return stolen
+
+
+class ExtractWorker(WorkerThread):
+    def __init__(self, zip_path, extract_path, final_path=None, ignored_folders=None, pipeline=None, direct=True,
+                 workers=EXTRACT_WORKERS, source_url=None):
         super().__init__()
         self.zip_path = zip_path
-        self.extract_path = extract_path  # 临时解压目录
-        self.final_path = final_path  # 最终目标目录
+        self.source_url = source_url
+        self.extract_path = extract_path  # 临时解压目录，直接解压模式下不使用
+        self.final_path = final_path  # 最终目标目录，先解压到同一分区的暂存目录，核对通过后整体替换
+        self.staging_path = get_release_staging_path(final_path) if final_path else None
         self.ignored_folders = ignored_folders if ignored_folders else IGNORED_FOLDERS
+        self.pipeline = pipeline  # 下载时已流式解压的结果
+        self.direct = direct
+        self.workers = workers
         self.signals = WorkerSignals()
         self._is_running = True
+        self._done_bytes = 0
+        self._last_progress = -1
 
     def stop(self):
         self._is_running = False
@@ -583,39 +2589,347 @@ class ExtractWorker(QThread):
 
     def run(self):
         try:
-            self.signals.log.emit(f"Ready to decompress: {self.zip_path} to {self.extract_path}")
-            os.makedirs(self.extract_path, exist_ok=True)
-
-            # 解压到临时目录
-            with zipfile.ZipFile(self.zip_path, "r") as zip_ref:
-                total_files = len(zip_ref.namelist())
-                for i, file_info in enumerate(zip_ref.infolist()):
-                    if not self._is_running:
-                        self.signals.log.emit("Decompression cancelled.")
-                        return
-                    zip_ref.extract(file_info, self.extract_path)
-                    progress = int(((i + 1) / total_files) * 50)
-                    self.signals.progress.emit(progress)
+            old_files = load_release_manifest(self.final_path).get("files", {}) if self.final_path else {}
+            if self.final_path and self.direct:
+                self._extract_direct(old_files)
+            else:
+                self._extract_with_copy()
+            if not self._is_running:
+                self.signals.log.emit("Decompression cancelled.")
+                if self.final_path:
+                    discard_release_staging(self.final_path)
+                return
 
             if self.final_path:
-                self.signals.log.emit(
-                    f"Currently copying the file from the temporary directory to the final destination: {self.final_path}")
+                swap_release_tree(self.final_path, old_files)
+            self.signals.log.emit("Decompression and copying are complete.")
+            self.signals.finished.emit()
+        except Exception as e:
+            # 暂存目录不完整，丢弃后旧版本保持原样，下次重新完整安装
+            if self.final_path:
+                discard_release_staging(self.final_path)
+            self.signals.log.emit(f"Decompression or copying error: {e}")
+            self.signals.error.emit(str(e))
 
-                extracted_items = os.listdir(self.extract_path)
-                if len(extracted_items) == 1 and os.path.isdir(os.path.join(self.extract_path, extracted_items[0])):
-                    source_dir = os.path.join(self.extract_path, extracted_items[0])
+    def _extract_direct(self, old_files):
+        # 去掉 zipball 顶层目录后直接写入暂存目录，每个文件先写临时文件再重命名
+        self.signals.log.emit(f"Ready to decompress: {self.zip_path} directly to {self.staging_path}")
+        extracted = {}
+        if self.pipeline:
+            self.pipeline.finish()
+            extracted = self.pipeline.extracted
+            self.signals.log.emit(f"{len(extracted)} entries already extracted while downloading")
+        else:
+            prepare_release_staging(self.final_path)
+
+        with zipfile.ZipFile(self.zip_path, "r") as zip_ref:
+            infos = zip_ref.infolist()
+            root = get_release_root([info.filename for info in infos])
+
+            directories = {self.staging_path}
+            members = []
+            for info in infos:
+                relative_path = info.filename[len(root):]
+                if not relative_path:
+                    continue
+                if info.is_dir():
+                    # 被忽略的目录本身照常创建，只是不写入其中的内容
+                    if not is_ignored_path(relative_path.rstrip("/"), self.ignored_folders):
+                        directories.add(safe_join_archive_path(self.staging_path, relative_path))
+                elif is_ignored_path(relative_path, self.ignored_folders):
+                    parts = relative_path.split("/")
+                    index = next(i for i, part in enumerate(parts[:-1]) if part in self.ignored_folders)
+                    directories.add(safe_join_archive_path(self.staging_path, "/".join(parts[:index + 1])))
                 else:
-                    source_dir = self.extract_path
+                    target = safe_join_archive_path(self.staging_path, relative_path)
+                    directories.add(os.path.dirname(target))
+                    members.append((info, target))
+            for directory in sorted(directories):
+                os.makedirs(directory, exist_ok=True)
+
+            total_bytes = sum(info.file_size for info, _ in members) or 1
+            self._done_bytes = sum(info.file_size for info, _ in members
+                                   if extracted.get(info.filename) == (info.CRC, info.file_size))
+            self._last_progress = -1
+            pending = [(info, target) for info, target in members
+                       if extracted.get(info.filename) != (info.CRC, info.file_size)]
+
+            def on_progress(size):
+                self._done_bytes += size
+                progress = int(self._done_bytes / total_bytes * 100)
+                if progress != self._last_progress:
+                    self._last_progress = progress
+                    self.signals.progress.emit(progress)
 
-                copy_with_ignore(source_dir, self.final_path, self.ignored_folders)
-                self.signals.progress.emit(100)
+            # 更新时 CRC 与已安装文件一致的条目直接从旧目录链接过来，不再解压
+            def is_unchanged(info, target):
+                relative_path = info.filename[len(root):]
+                if not installed_file_matches(self.final_path, relative_path, old_files, info.CRC, info.file_size):
+                    return False
+                link_or_copy(os.path.join(self.final_path, *relative_path.split("/")), target)
+                return True
+
+            if not extract_members_parallel(self.zip_path, pending, self.workers, lambda: self._is_running,
+                                            on_progress, is_unchanged):
+                return
+
+            write_release_manifest(self.staging_path, release_manifest_from_zip(zip_ref, self.ignored_folders),
+                                   self.source_url)
+        self.signals.progress.emit(100)
+
+    def _extract_with_copy(self):
+        self.signals.log.emit(f"Ready to decompress: {self.zip_path} to {self.extract_path}")
+        os.makedirs(self.extract_path, exist_ok=True)
+
+        # 解压到临时目录
+        with zipfile.ZipFile(self.zip_path, "r") as zip_ref:
+            total_files = len(zip_ref.namelist())
+            for i, file_info in enumerate(zip_ref.infolist()):
+                if not self._is_running:
+                    return
+                zip_ref.extract(file_info, self.extract_path)
+                progress = int(((i + 1) / total_files) * 50)
+                self.signals.progress.emit(progress)
+
+        if self.final_path:
+            self.signals.log.emit(
+                f"Currently copying the file from the temporary directory to the final destination: {self.final_path}")
+
+            extracted_items = os.listdir(self.extract_path)
+            if len(extracted_items) == 1 and os.path.isdir(os.path.join(self.extract_path, extracted_items[0])):
+                source_dir = os.path.join(self.extract_path, extracted_items[0])
             else:
-                self.signals.progress.emit(100)
+                source_dir = self.extract_path
 
-            self.signals.log.emit("Decompression and copying are complete.")
+            prepare_release_staging(self.final_path)
+            copy_with_ignore(source_dir, self.staging_path, self.ignored_folders)
+            with zipfile.ZipFile(self.zip_path, "r") as zip_ref:
+                write_release_manifest(self.staging_path, release_manifest_from_zip(zip_ref, self.ignored_folders),
+                                       self.source_url)
+        self.signals.progress.emit(100)
+
+
+class VerifyWorker(WorkerThread):
+    def __init__(self, final_path, workers=EXTRACT_WORKERS):
+        super().__init__()
+        self.final_path = final_path
+        self.workers = workers
+        self.signals = WorkerSignals()
+        self._is_running = True
+        self._done_bytes = 0
+
+    def stop(self):
+        self._is_running = False
+        self.wait()
+
+    def run(self):
+        try:
+            manifest = load_release_manifest(self.final_path)
+            files = manifest.get("files", {})
+            if not files:
+                self.signals.log.emit("No install manifest found, cannot verify installed files")
+                self.signals.result.emit(json.dumps(None))
+                self.signals.finished.emit()
+                return
+
+            self.signals.log.emit(f"Verifying {len(files)} installed files...")
+            total_bytes = sum(entry["size"] for entry in files.values()) or 1
+
+            def on_progress(size):
+                self._done_bytes += size
+                self.signals.progress.emit(int(self._done_bytes / total_bytes * 100))
+
+            mismatched = verify_installed_files(self.final_path, files, self.workers, lambda: self._is_running,
+                                                on_progress)
+            if not self._is_running:
+                self.signals.log.emit("Verification cancelled.")
+                return
+
+            if mismatched:
+                # 从清单中移除损坏的文件，之后的更新流程会重新获取它们
+                for relative_path in mismatched:
+                    self.signals.log.emit(f"Damaged or missing: {relative_path}")
+                    files.pop(relative_path, None)
+                write_json_atomic(os.path.join(self.final_path, RELEASE_MANIFEST_NAME), manifest)
+            self.signals.log.emit(f"Verification finished: {len(mismatched)} of {len(files) + len(mismatched)} files need repair")
+            self.signals.result.emit(json.dumps(mismatched))
             self.signals.finished.emit()
         except Exception as e:
-            self.signals.log.emit(f"Decompression or copying error: {e}")
+            self.signals.log.emit(f"Verification error: {e}")
+            self.signals.error.emit(str(e))
+
+
+class DeltaUpdateWorker(WorkerThread):
+    """只下载发生变化的文件：通过 Range 读取 zip 中央目录，与已安装文件的 CRC 比较"""
+
+    def __init__(self, url, final_path, ignored_folders=None):
+        super().__init__()
+        self.url = url
+        self.final_path = final_path
+        self.ignored_folders = ignored_folders if ignored_folders else IGNORED_FOLDERS
+        self.signals = WorkerSignals()
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+        self.wait()
+
+    def run(self):
+        try:
+            applied = self._apply_delta()
+        except Exception as e:
+            self.signals.log.emit(f"Delta update failed, falling back to full download: {e}")
+            applied = False
+        if not applied:
+            # 安装目录没有被改动过，丢弃暂存目录即可
+            discard_release_staging(self.final_path)
+        if not self._is_running:
+            self.signals.log.emit("Delta update cancelled.")
+            return
+        self.signals.result.emit("applied" if applied else "fallback")
+
+    def _apply_delta(self):
+        session = requests.Session()
+        with session.get(self.url, headers={"Range": "bytes=0-0"}, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            total_size = get_content_range_total(response)
+            url = response.url
+            if response.status_code != 206 or total_size <= 0:
+                self.signals.log.emit("Server does not support range requests, delta update not possible")
+                return False
+
+        tail_start = max(0, total_size - ZIP_TAIL_SIZE)
+        tail = http_range_get(session, url, tail_start, total_size)
+        cd_offset, cd_size = find_zip_central_directory(tail)
+        if cd_offset >= tail_start:
+            central_directory = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+        else:
+            central_directory = http_range_get(session, url, cd_offset, cd_offset + cd_size)
+        entries = parse_zip_central_directory(central_directory)
+        if not entries:
+            raise Exception("Empty central directory")
+
+        # 每个条目的数据延伸到下一个条目的本地文件头（或中央目录）为止
+        offsets = sorted({entry["offset"] for entry in entries}) + [cd_offset]
+        next_offset = {offsets[i]: offsets[i + 1] for i in range(len(offsets) - 1)}
+        root = get_release_root([entry["name"] for entry in entries])
+
+        # 新版本在暂存目录中组装：未变化的文件硬链接过去，变化的文件写入暂存目录，删除的文件不带过去
+        staging_path = prepare_release_staging(self.final_path)
+        old_manifest = load_release_manifest(self.final_path).get("files", {})
+        new_manifest = {}
+        changed = []
+        unchanged = []
+        for entry in entries:
+            if not self._is_running:
+                return False
+            relative_path = entry["name"][len(root):]
+            if not relative_path or relative_path.endswith("/") or is_ignored_path(relative_path, self.ignored_folders):
+                continue
+            new_manifest[relative_path] = {"size": entry["size"], "crc32": entry["crc32"]}
+            if installed_file_matches(self.final_path, relative_path, old_manifest, entry["crc32"], entry["size"]):
+                unchanged.append(relative_path)
+                continue
+            entry["path"] = os.path.join(staging_path, *relative_path.split("/"))
+            entry["end"] = next_offset[entry["offset"]]
+            changed.append(entry)
+
+        removed = [path for path in old_manifest if path not in new_manifest]
+        fetch_size = sum(entry["end"] - entry["offset"] for entry in changed)
+        self.signals.log.emit(
+            f"Delta update: {len(changed)} changed or added, {len(removed)} removed, "
+            f"{fetch_size} of {total_size} bytes to fetch")
+        if fetch_size > total_size * DELTA_UPDATE_MAX_RATIO:
+            self.signals.log.emit("Too many changes for a delta update")
+            return False
+
+        # 相邻的条目合并成一个 Range 请求
+        groups = []
+        for entry in sorted(changed, key=lambda e: e["offset"]):
+            if groups and entry["offset"] - groups[-1][-1]["end"] <= DELTA_RANGE_GAP:
+                groups[-1].append(entry)
+            else:
+                groups.append([entry])
+
+        for relative_path in unchanged:
+            target = os.path.join(staging_path, *relative_path.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            link_or_copy(os.path.join(self.final_path, *relative_path.split("/")), target)
+
+        fetched = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_SEGMENTS) as executor:
+            futures = {executor.submit(self._fetch_group, url, group): group for group in groups}
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                fetched += sum(entry["end"] - entry["offset"] for entry in futures[future])
+                if fetch_size:
+                    self.signals.progress.emit(int(fetched / fetch_size * 95))
+                if not self._is_running:
+                    for pending in futures:
+                        pending.cancel()
+                    return False
+
+        for relative_path in removed:
+            self.signals.log.emit(f"Dropping file removed from release: {relative_path}")
+
+        # 所有分组都下载并通过 CRC 校验后才替换安装目录
+        write_release_manifest(staging_path, new_manifest, self.url)
+        swap_release_tree(self.final_path, old_manifest)
+        self.signals.progress.emit(100)
+        self.signals.log.emit("Delta update applied.")
+        return True
+
+    def _fetch_group(self, url, group):
+        if not self._is_running:
+            return
+        start, end = group[0]["offset"], group[-1]["end"]
+        with requests.Session() as session:
+            blob = http_range_get(session, url, start, end)
+        for entry in group:
+            data = read_zip_entry(entry, blob[entry["offset"] - start:entry["end"] - start])
+            os.makedirs(os.path.dirname(entry["path"]), exist_ok=True)
+            with open(entry["path"], "wb") as f:
+                f.write(data)
+
+
+class ReleaseInfoWorker(WorkerThread):
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self._is_running = True
+
+    def stop(self):
+        self._is_running = False
+        self.wait()
+
+    def run(self):
+        try:
+            endpoints = get_release_endpoints()
+            self.signals.log.emit(f"Attempting to get the latest version from GitHub: {list(endpoints)}")
+            is_valid = lambda d: "zipball" in (d.get("zipball_url") or "")
+            cache = MetadataCache()
+            # 服务器数据已经给出更新的版本时，TTL 内的缓存也必须用条件请求重新验证
+            _, cached = cache.newest(list(endpoints), is_valid, max_age=cache.ttl)
+            server_version = get_server_data().get("version")
+            if cached and is_release_outdated(cached.get("tag_name"), server_version):
+                self.signals.log.emit(f"Cached release {cached.get('tag_name')} is older than server version "
+                                      f"{server_version}, revalidating")
+                cache = MetadataCache(ttl=0)
+            api_url, data = race_json_requests(
+                list(endpoints), RELEASE_INFO_TIMEOUT, RELEASE_INFO_TIMEOUT, is_valid, cache=cache
+            )
+            if not self._is_running:
+                return
+            if data is None:
+                raise Exception("Failed to get info from GitHub")
+
+            # 使用最先响应的代理下载 zipball
+            release_url = endpoints[api_url] + data["zipball_url"]
+            self.signals.log.emit(f"Received download URL from GitHub: {release_url}")
+            self.signals.result.emit(release_url)
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.log.emit(f"Release info error: {e}")
             self.signals.error.emit(str(e))
 
 
@@ -650,7 +2964,181 @@ def replace_modules_with_json(install_path):
         log(f"替换模块文件时出错: {e}")
 
 
-class InstallWorker(QThread):
+def normalize_package_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def get_site_packages_dirs(venv_path):
+    windows_path = os.path.join(venv_path, "Lib", "site-packages")
+    if os.path.isdir(windows_path):
+        return [windows_path]
+    lib_path = os.path.join(venv_path, "lib")
+    if not os.path.isdir(lib_path):
+        return []
+    return [os.path.join(lib_path, name, "site-packages") for name in sorted(os.listdir(lib_path))
+            if os.path.isdir(os.path.join(lib_path, name, "site-packages"))]
+
+
+def get_venv_python_version(venv_path):
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return value.strip()
+    except OSError:
+        pass
+    return None
+
+
+def iter_distribution_metadata(site_packages_dirs):
+    """直接读取 *.dist-info/METADATA，逐个返回 (包名, 版本, 依赖的规范化包名集合)，不启动 pip"""
+    for site_packages in site_packages_dirs:
+        for entry in os.listdir(site_packages):
+            if entry.endswith(".dist-info"):
+                metadata_path = os.path.join(site_packages, entry, "METADATA")
+            elif entry.endswith(".egg-info"):
+                metadata_path = os.path.join(site_packages, entry, "PKG-INFO")
+            else:
+                continue
+            name = version = None
+            requires = set()
+            try:
+                with open(metadata_path, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        if not line.strip():
+                            break
+                        if line.startswith("Name:"):
+                            name = line[5:].strip()
+                        elif line.startswith("Version:"):
+                            version = line[8:].strip()
+                        elif line.startswith("Requires-Dist:"):
+                            match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", line[14:])
+                            if match:
+                                requires.add(normalize_package_name(match.group(1)))
+            except OSError:
+                continue
+            if name and version:
+                yield name, version, requires
+
+
+def read_installed_distributions(site_packages_dirs):
+    """返回 {规范化包名: 版本}"""
+    return {normalize_package_name(name): version
+            for name, version, _ in iter_distribution_metadata(site_packages_dirs)}
+
+
+def find_unrequired_packages(site_packages_dirs, names):
+    """names 中没有被其他已安装包依赖的包；被保留的包所依赖的包也一并保留"""
+    requires = {normalize_package_name(name): deps
+                for name, _, deps in iter_distribution_metadata(site_packages_dirs)}
+    candidates = {normalize_package_name(name) for name in names}
+    while True:
+        needed = set()
+        for name, deps in requires.items():
+            if name not in candidates:
+                needed |= deps
+        kept = candidates & needed
+        if not kept:
+            break
+        candidates -= kept
+    return [name for name in names if normalize_package_name(name) in candidates]
+
+
+def read_requirement_lines(requirements_file):
+    lines = []
+    with open(requirements_file, encoding="utf-8") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if line and not line.startswith(("#", "-")):
+                lines.append(line)
+    return lines
+
+
+def get_marker_environment(venv_path):
+    # 环境标记按 venv 的 Python 版本计算，而不是启动器自身的 Python
+    python_version = get_venv_python_version(venv_path)
+    if not python_version:
+        return {}
+    return {
+        "python_version": ".".join(python_version.split(".")[:2]),
+        "python_full_version": python_version,
+        "implementation_version": python_version,
+    }
+
+
+def find_unsatisfied_requirements(venv_path, lines):
+    """检查包名、版本约束和环境标记，返回 [(requirement 行, 原因)]"""
+    from packaging.requirements import Requirement
+    from packaging.version import Version, InvalidVersion
+
+    installed = read_installed_distributions(get_site_packages_dirs(venv_path))
+    environment = get_marker_environment(venv_path)
+
+    unsatisfied = []
+    for line in lines:
+        requirement = Requirement(line)
+        if requirement.marker and not requirement.marker.evaluate(environment):
+            continue
+        version = installed.get(normalize_package_name(requirement.name))
+        if version is None:
+            unsatisfied.append((line, f"{requirement.name} (not installed)"))
+            continue
+        try:
+            satisfied = requirement.specifier.contains(Version(version), prereleases=True)
+        except InvalidVersion:
+            satisfied = not requirement.specifier
+        if not satisfied:
+            unsatisfied.append((line, f"{requirement.name} {version} does not satisfy {requirement.specifier}"))
+    return unsatisfied
+
+
+def check_requirements(venv_path, requirements_file):
+    lines = read_requirement_lines(requirements_file)
+    return [problem for _, problem in find_unsatisfied_requirements(venv_path, lines)]
+
+
+def diff_requirements(previous, current):
+    """对比两次的 requirements，返回 (需要安装的行, 需要卸载的包名)"""
+    from packaging.requirements import Requirement
+
+    def by_name(lines):
+        return {normalize_package_name(Requirement(line).name): line for line in lines}
+
+    previous_by_name = by_name(previous)
+    current_by_name = by_name(current)
+    changed = [line for name, line in current_by_name.items()
+               if name not in previous_by_name
+               or str(Requirement(previous_by_name[name])) != str(Requirement(line))]
+    dropped = [name for name in previous_by_name if name not in current_by_name]
+    return changed, dropped
+
+
+def get_dependency_fingerprint(venv_path, requirements_file):
+    # requirements.txt 内容 + site-packages 目录修改时间，安装或卸载包都会改变目录的修改时间
+    with open(requirements_file, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    for site_packages in get_site_packages_dirs(venv_path):
+        digest.update(f"{site_packages}:{os.stat(site_packages).st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def verify_dependencies(venv_path, requirements_file):
+    fingerprint = get_dependency_fingerprint(venv_path, requirements_file)
+    if get_dependency_check().get("fingerprint") == fingerprint:
+        log("Dependencies unchanged since last successful check, skipping verification.")
+        return []
+
+    problems = check_requirements(venv_path, requirements_file)
+    if not problems:
+        try:
+            set_dependency_check({"fingerprint": fingerprint, "checked": time.time()})
+        except Exception as e:
+            log(f"Error saving dependency check: {e}")
+    return problems
+
+
+class InstallWorker(WorkerThread):
     def __init__(self, install_path, requirements_path):
         super().__init__()
         self.install_path = install_path
@@ -658,6 +3146,9 @@ class InstallWorker(QThread):
         self.signals = WorkerSignals()
         self._is_running = True
         self.process = None
+        self._snapshot_key = None
+        self._report_path = None
+        self._venv_path = None
 
     def stop(self):
         self._is_running = False
@@ -672,7 +3163,16 @@ class InstallWorker(QThread):
         try:
             self.signals.log.emit(f"Creating virtual environment at {self.install_path}...")
             venv_path = os.path.join(self.install_path, "venv")
-            if not os.path.exists(venv_path):
+            self._snapshot_key = None
+            # 快照只对同一个解释器（含补丁版本和构建）有效，取不到版本时不使用快照
+            interpreter_version = get_interpreter_version(self._get_python_from_registry())
+            if os.path.exists(self.requirements_path) and interpreter_version:
+                self._snapshot_key = VenvSnapshots.make_key(self.requirements_path, self.install_path,
+                                                            interpreter_version)
+                if self._restore_snapshot(venv_path):
+                    return
+            venv_created = not os.path.exists(venv_path)
+            if venv_created:
                 self.signals.log.emit("Creating new virtual environment...")
 
                 # 使用ExVR注册表中的Python解释器
@@ -681,12 +3181,13 @@ class InstallWorker(QThread):
                     delete_config()
                     raise Exception("Python interpreter not found in ExVR registry")
 
-                self.process = subprocess.Popen(
-                    [python_path, "-m", "venv", venv_path],
-                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                self.process.wait()
+                with tracer.span("venv create", "subprocess"):
+                    self.process = subprocess.Popen(
+                        [python_path, "-m", "venv", venv_path],
+                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                        creationflags=subprocess.CREATE_NO_WINDOW
+                    )
+                    self.process.wait()
                 if self.process.returncode != 0:
                     raise Exception("Failed to create virtual environment")
             else:
@@ -700,59 +3201,128 @@ class InstallWorker(QThread):
             if not os.path.exists(self.requirements_path): raise FileNotFoundError(
                 f"requirements.txt not found: {self.requirements_path}")
 
+            requirements = read_requirement_lines(self.requirements_path)
+            previous = get_installed_requirements()
+            if venv_created or os.path.normcase(previous.get("venv", "")) != os.path.normcase(venv_path):
+                previous = {}
+
+            to_install = None  # None 表示完整安装 requirements.txt
+            if "requirements" in previous:
+                unsatisfied = [line for line, _ in find_unsatisfied_requirements(venv_path, requirements)]
+                if previous["requirements"] == requirements and not unsatisfied:
+                    self.signals.log.emit("Requirements unchanged and satisfied, skipping pip.")
+                    self._finish()
+                    return
+                to_install, dropped = diff_requirements(previous["requirements"], requirements)
+                to_install += [line for line in unsatisfied if line not in to_install]
+                unrequired = find_unrequired_packages(get_site_packages_dirs(venv_path), dropped)
+                if len(unrequired) < len(dropped):
+                    self.signals.log.emit(
+                        "Keeping dropped requirements still required by other packages: "
+                        f"{', '.join(name for name in dropped if name not in unrequired)}")
+                if unrequired:
+                    self._uninstall(pip_path, unrequired)
+                    if not self._is_running: return
+                if not to_install:
+                    self.signals.log.emit("No requirements to install.")
+                    set_installed_requirements({"venv": venv_path, "requirements": requirements})
+                    self._finish()
+                    return
+                self.signals.log.emit(f"Installing changed requirements: {', '.join(to_install)}")
+
             install_success = False
             full_error_output = ""
+            install_args = ["-r", self.requirements_path] if to_install is None else to_install
+            wheelhouse = Wheelhouse()
+            requirements_hash = Wheelhouse.requirements_hash(requirements)
+            pip_version = get_pip_version(venv_path)
+            self._report_path = None
+            if pip_version >= (22, 2):
+                fd, self._report_path = tempfile.mkstemp(prefix="exvr_pip_report_", suffix=".json")
+                os.close(fd)
+            report_args = ["--report", self._report_path] if self._report_path else []
+            progress_args = ["--progress-bar", "raw"] if pip_version >= (24, 1) else []
+            offline_cmd = [pip_path, "install", "--no-index", "--find-links", wheelhouse.folder] + report_args + install_args
+            used_files = set()
+            self._venv_path = venv_path
+            self._progress = 20
+
+            if wheelhouse.covers(requirements_hash):
+                self.signals.log.emit("Wheelhouse satisfies all requirements, installing offline...")
+                returncode = self._install_offline(offline_cmd, PipTelemetry(wheelhouse.folder), 20)
+                if not self._is_running: return
+                if returncode == 0:
+                    install_success = True
+                    used_files = wheelhouse.files_for(requirements_hash)
+                else:
+                    self.signals.log.emit("Offline installation from wheelhouse failed, falling back to mirrors.")
 
-            for i, mirror in enumerate(PIP_MIRRORS):
-                self.signals.log.emit(
-                    f"Attempting to install requirements from {self.requirements_path} using mirror: {mirror} ({i + 1}/{len(PIP_MIRRORS)})...")
-
-                cmd = [pip_path, "install", "-i", mirror, "-r", self.requirements_path]
-
-                self.process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-
-                output_lines = []
-                progress = 0
-                while self._is_running:
-                    line = self.process.stdout.readline()
-                    if not line and self.process.poll() is not None:
-                        break
-                    if line:
-                        output_lines.append(line)
-                        self.signals.log.emit(line.strip())
-                        if "Collecting" in line:
-                            progress = min(progress + 2, 90)
-                            self.signals.progress.emit(progress)
-                        elif "Installing" in line:
-                            progress = min(progress + 1, 95)
-                            self.signals.progress.emit(progress)
+            mirrors = [] if install_success else rank_pip_mirrors(PIP_MIRRORS, self.signals.log.emit)
+            if not self._is_running: return
 
-                if not self._is_running:
-                    return
+            if mirrors:
+                try:
+                    missing = [line for line, _ in find_unsatisfied_requirements(
+                        venv_path, requirements if to_install is None else to_install)]
+                    prefetch_wheels(missing, venv_path, mirrors, wheelhouse.folder,
+                                    lambda: self._is_running, self.signals.log.emit)
+                except Exception as e:
+                    self.signals.log.emit(f"Wheel prefetch failed, pip will download instead: {e}")
+                if not self._is_running: return
 
-                self.process.wait()
+            # 每次安装只用最快的镜像解析一次完整的包集合，换镜像重试时沿用
+            report = None
+            if mirrors and self._report_path:
+                report = self._resolve(pip_path, mirrors[0], install_args, wheelhouse.folder)
+                if not self._is_running: return
 
-                if self.process.returncode == 0:
+            for i, mirror in enumerate(mirrors):
+                self.signals.log.emit(
+                    f"Attempting to install requirements from {self.requirements_path} using mirror: {mirror} ({i + 1}/{len(mirrors)})...")
+
+                telemetry = PipTelemetry(wheelhouse.folder)
+                if report:
+                    telemetry.load_report(report, local_download_sizes(report, wheelhouse.folder))
+
+                # 先用 pip wheel 把所有包变成 wheel 放进 wheelhouse 再离线安装，下载过的包都会保留下来；
+                # 只有源码包的依赖在这一步联网构建，构建依赖也从镜像获取
+                returncode = self._run_pip(
+                    [pip_path, "wheel", "-w", wheelhouse.folder, "--find-links", wheelhouse.folder,
+                     "-i", mirror] + progress_args + install_args, telemetry, 20, 70)
+                if not self._is_running: return
+                record_pip_mirror_result(mirror, returncode == 0)
+                if returncode == 0:
+                    used_files = wheelhouse.files_in_output(telemetry.files)
+                    returncode = self._install_offline(offline_cmd, telemetry, 70)
+                    if not self._is_running: return
+
+                if returncode == 0:
                     self.signals.log.emit(f"Requirements installation completed successfully using mirror: {mirror}.")
                     install_success = True
                     break
                 else:
-                    current_error_output = "".join(output_lines)
+                    # 只保留最后若干行输出用于报错
+                    current_error_output = "\n".join(telemetry.tail)
                     full_error_output += f"\n--- Error from mirror {mirror} ---\n{current_error_output}"
                     self.signals.log.emit(
-                        f"Requirements installation failed with return code {self.process.returncode} using mirror: {mirror}.")
-                    if i == len(PIP_MIRRORS) - 1:
+                        f"Requirements installation failed with return code {returncode} using mirror: {mirror}.")
+                    if i == len(mirrors) - 1:
                         raise Exception(f"All attempts to install requirements failed. Last error: {full_error_output}")
 
+            if install_success and used_files:
+                if to_install is not None:
+                    # 只安装了变化的部分，未变化的包沿用上一次集合的引用
+                    used_files |= wheelhouse.files_for(Wheelhouse.requirements_hash(previous["requirements"]))
+                try:
+                    wheelhouse.record(requirements_hash, used_files)
+                    self.signals.log.emit(
+                        f"Wheelhouse size: {wheelhouse.total_size() / (1024 * 1024):.1f} MB")
+                except Exception as e:
+                    self.signals.log.emit(f"Error updating wheelhouse: {e}")
+
             if install_success:
-                self.signals.log.emit("Extraction completed, starting module file replacement")
-                replace_modules_with_json(self.install_path)
-                self.signals.progress.emit(100)
-                self.signals.finished.emit()
+                set_installed_requirements({"venv": venv_path, "requirements": requirements})
+                self._finish()
             else:
                 # This should ideally not be reached if the loop handles failures correctly
                 raise Exception("All attempts to install requirements failed unexpectedly.")
@@ -760,6 +3330,141 @@ class InstallWorker(QThread):
         except Exception as e:
             self.signals.log.emit(f"Installation error: {e}")
             self.signals.error.emit(str(e))
+        finally:
+            if self._report_path and os.path.exists(self._report_path):
+                os.remove(self._report_path)
+
+    def _run_pip(self, cmd, telemetry, low, high, watch_install=False):
+        with tracer.span(f"pip {cmd[1]}", "subprocess") as trace_args:
+            self.process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+
+            # 安装阶段 pip 没有输出，定时检查 site-packages 里新写入的 RECORD
+            stop_watch = threading.Event()
+            site_packages_dirs = get_site_packages_dirs(self._venv_path)
+
+            def watch():
+                while not stop_watch.wait(PIP_INSTALL_POLL_INTERVAL):
+                    if telemetry.poll_installed(site_packages_dirs):
+                        self._emit_pip_progress(telemetry, low, high)
+
+            if watch_install:
+                threading.Thread(target=watch, daemon=True).start()
+            try:
+                while self._is_running:
+                    line = self.process.stdout.readline()
+                    if not line and self.process.poll() is not None:
+                        break
+                    if line:
+                        telemetry.feed(line)
+                        if not line.startswith("Progress "):
+                            self.signals.log.emit(line.strip())
+                        self._emit_pip_progress(telemetry, low, high)
+            finally:
+                stop_watch.set()
+
+            if not self._is_running:
+                return None
+            self.process.wait()
+            trace_args["returncode"] = self.process.returncode
+            trace_args["bytes"] = sum(entry["size"] or 0 for entry in telemetry.packages.values())
+            return self.process.returncode
+
+    def _emit_pip_progress(self, telemetry, low, high):
+        progress = low + int((high - low) * telemetry.fraction())
+        if progress > self._progress:
+            self._progress = progress
+            self.signals.progress.emit(progress)
+
+    def _resolve(self, pip_path, mirror, install_args, folder):
+        """dry-run 解析出完整的包集合，下载进度按包计算；失败时返回 None"""
+        with tracer.span("pip resolve", "subprocess", mirror=mirror) as trace_args:
+            self.process = subprocess.Popen(
+                [pip_path, "install", "--dry-run", "--ignore-installed", "--quiet", "--report", self._report_path,
+                 "-i", mirror, "--find-links", folder] + install_args,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            output, _ = self.process.communicate()
+            trace_args["returncode"] = self.process.returncode
+        if not self._is_running:
+            return None
+        if self.process.returncode != 0:
+            self.signals.log.emit(f"Resolving requirements with {mirror} failed, download progress will be estimated: "
+                                  f"{output.strip()[-500:]}")
+            return None
+        try:
+            with open(self._report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            self.signals.log.emit(f"Resolved {len(report.get('install', []))} packages")
+            return report
+        except Exception as e:
+            self.signals.log.emit(f"Error reading pip report: {e}")
+            return None
+
+    def _install_offline(self, cmd, telemetry, low):
+        returncode = self._run_pip(cmd, telemetry, low, 95, watch_install=True)
+        if returncode != 0:
+            return returncode
+        telemetry.finish(get_site_packages_dirs(self._venv_path))
+        if self._report_path:
+            try:
+                with open(self._report_path, "r", encoding="utf-8") as f:
+                    telemetry.load_report(json.load(f))
+            except Exception as e:
+                self.signals.log.emit(f"Error reading pip report: {e}")
+        for line in telemetry.summary_lines():
+            self.signals.log.emit(line)
+        return returncode
+
+    def _restore_snapshot(self, venv_path):
+        snapshots = VenvSnapshots()
+        if not snapshots.has(self._snapshot_key):
+            return False
+        requirements = read_requirement_lines(self.requirements_path)
+        if os.path.exists(venv_path) and not find_unsatisfied_requirements(venv_path, requirements):
+            return False
+        self.signals.log.emit(f"Restoring virtual environment from snapshot {self._snapshot_key[:12]}...")
+        try:
+            snapshots.restore(self._snapshot_key, venv_path, self._get_python_from_registry(),
+                              index_urls=PIP_MIRRORS, find_links=Wheelhouse().folder)
+        except Exception as e:
+            self.signals.log.emit(f"Restoring venv snapshot failed, installing with pip: {e}")
+            return False
+        set_installed_requirements({"venv": venv_path, "requirements": requirements})
+        self._finish()
+        return True
+
+    def _finish(self):
+        self.signals.log.emit("Extraction completed, starting module file replacement")
+        replace_modules_with_json(self.install_path)
+        snapshots = VenvSnapshots()
+        if self._snapshot_key and not snapshots.has(self._snapshot_key):
+            self.signals.log.emit("Saving virtual environment snapshot...")
+            try:
+                snapshots.create(self._snapshot_key, os.path.join(self.install_path, "venv"))
+            except Exception as e:
+                self.signals.log.emit(f"Saving venv snapshot failed: {e}")
+        self.signals.progress.emit(100)
+        self.signals.finished.emit()
+
+    def _uninstall(self, pip_path, names):
+        self.signals.log.emit(f"Uninstalling dropped requirements: {', '.join(names)}")
+        with tracer.span("pip uninstall", "subprocess", packages=names):
+            self.process = subprocess.Popen(
+                [pip_path, "uninstall", "-y"] + names,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            for line in self.process.stdout:
+                self.signals.log.emit(line.strip())
+            self.process.wait()
+        if self.process.returncode != 0:
+            # 卸载失败不影响运行，只记录日志
+            self.signals.log.emit(f"Uninstalling dropped requirements failed with return code {self.process.returncode}")
 
     def _get_python_from_registry(self):
         try:
@@ -771,17 +3476,450 @@ class InstallWorker(QThread):
         return None
 
 
-class SilentInstaller:
+def get_local_version(install_path):
+    config_path = os.path.join(install_path, "exvr", "settings", "config.json")
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path, "r") as f:
+        return json.load(f).get("Version")
+
+
+def launch_application(install_path, args):
+    """检查安装和依赖后启动 ExVR，失败时抛出异常"""
+    app_log_dir = get_resource_path("logs")
+    os.makedirs(app_log_dir, exist_ok=True)
+
+    exvr_path = os.path.join(install_path, "exvr")
+    python_path = os.path.join(install_path, "python")
+    venv_path = os.path.join(exvr_path, "venv", "Scripts")
+    main_script = os.path.join(exvr_path, "main.py")
+    venv_python = os.path.join(venv_path, "python.exe")
+    requirements_file = os.path.join(exvr_path, "requirements.txt")
+    if not os.path.exists(python_path):
+        raise FileNotFoundError(f"Python not found at {python_path}")
+    if not os.path.exists(venv_python):
+        raise FileNotFoundError(f"Virtual environment Python not found at {venv_python}")
+    if not os.path.exists(main_script):
+        raise FileNotFoundError("Main application script not found.")
+    if not os.path.exists(requirements_file):
+        raise FileNotFoundError("Requirements not found.")
+
+    problems = verify_dependencies(os.path.join(exvr_path, "venv"), requirements_file)
+    if problems:
+        for problem in problems:
+            log(f"Required packages missing: {problem}")
+        raise Exception(f"Requirements not satisfied: {', '.join(problems)}")
+
+    log(f"Running command: {venv_python} {main_script}")
+    os.chdir(exvr_path)
+
+    flags = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_CONSOLE
+
+    log("Using CREATE_NO_WINDOW flag to hide initial console only")
+
+    # 检查是否有-log参数
+    cmd = [venv_python, main_script, "--log-dir", app_log_dir]
+    if args.log:
+        cmd.append("-log")
+
+    with tracer.span("launch application", "subprocess"):
+        subprocess.Popen(
+            cmd,
+            creationflags=flags,
+            close_fds=True,
+            shell=False,
+            stdin=None,
+            stdout=None,
+            stderr=None
+        )
+
+    time.sleep(1)
+
+
+def install_path_overridden(args, install_path):
+    """--install-path 指定了与配置中不同的安装位置"""
+    if not args.install_path or not install_path:
+        return False
+    return os.path.normcase(os.path.normpath(normalize_path(args.install_path))) != \
+        os.path.normcase(os.path.normpath(install_path))
+
+
+def warm_launch(args):
+    """已安装、版本最新且依赖满足时不加载任何界面直接启动 ExVR，返回是否已启动"""
+    tracer.phase("warm_launch")
+    install_path = get_install_path()
+    if not install_path or not get_python_path() or install_path_overridden(args, install_path):
+        return False
+    data = get_server_data()
+    remote_lau_version = data.get("lau_version")
+    if remote_lau_version is not None and remote_lau_version > LAU_VERSION:
+        return False
+    remote_version = data.get("version")
+    cwd = os.getcwd()
+    try:
+        if remote_version and args.update != "never" and get_local_version(install_path) != remote_version:
+            return False
+        launch_application(install_path, args)
+    except Exception as e:
+        # 配置文件按当前目录查找，交给安装流程前恢复
+        os.chdir(cwd)
+        log(f"Warm launch not possible, starting the installer: {e}")
+        return False
+    log("Application launched without loading the installer UI.")
+    return True
+
+
+class InstallerUI(abc.ABC):
+    """SilentInstaller 通过这个接口和用户交互，Qt 界面与 --headless 控制台分别实现"""
+
+    @abc.abstractmethod
+    def select_install_path(self):
+        pass
+
+    @abc.abstractmethod
+    def show_progress(self, title, label, on_cancel):
+        pass
+
+    @abc.abstractmethod
+    def update_progress(self, value):
+        pass
+
+    @abc.abstractmethod
+    def close_progress(self):
+        pass
+
+    @abc.abstractmethod
+    def show_error(self, title, message):
+        pass
+
+    @abc.abstractmethod
+    def show_info(self, title, message):
+        pass
+
+    @abc.abstractmethod
+    def ask_question(self, title, question):
+        pass
+
+    @abc.abstractmethod
+    def show_board(self, title, text):
+        pass
+
+    @abc.abstractmethod
+    def show_launcher_update(self, content):
+        pass
+
+    @abc.abstractmethod
+    def bring_to_front(self):
+        pass
+
+    @abc.abstractmethod
+    def wait_process(self, process):
+        pass
+
+    @abc.abstractmethod
+    def call_later(self, msec, callback):
+        pass
+
+    @abc.abstractmethod
+    def exec(self):
+        pass
+
+    @abc.abstractmethod
+    def quit(self):
+        pass
+
+
+class QtInstallerUI(InstallerUI):
+    def __init__(self, app):
+        self.app = app
+        self.progress_dialog = None
+        # 工作线程的信号投递到 EventLoop，由主线程定时取出执行
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(EventLoop.process_pending)
+        self.timer.start(10)
+
+    def select_install_path(self):
+        dialog = CustomFileDialog()
+        if dialog.exec() == QtWidgets.QDialog.Accepted:
+            return dialog.get_selected_path()
+        return None
+
+    def show_progress(self, title, label, on_cancel):
+        self.close_progress()
+        self.progress_dialog = QtWidgets.QProgressDialog(label, "Cancel", 0, 100, None)
+        self.progress_dialog.setWindowTitle(title)
+        self.progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        self.progress_dialog.setAutoClose(False)
+        self.progress_dialog.setAutoReset(False)
+
+        self.progress_dialog.canceled.connect(on_cancel)
+
+        self.progress_dialog.setValue(0)
+        self.progress_dialog.show()
+        self.app.processEvents()
+
+    def update_progress(self, value):
+        if self.progress_dialog:
+            self.progress_dialog.setValue(value)
+            self.app.processEvents()
+
+    def close_progress(self):
+        if self.progress_dialog:
+            try:
+                self.progress_dialog.canceled.disconnect()
+            except:
+                pass
+
+            self.progress_dialog.close()
+            self.progress_dialog = None
+
+    def show_error(self, title, message):
+        show_error_message(title, message)
+
+    def show_info(self, title, message):
+        show_info_message(title, message)
+
+    def ask_question(self, title, question):
+        return ask_question(title, question) == QtWidgets.QMessageBox.Yes
+
+    def show_board(self, title, text):
+        dialog = QtWidgets.QDialog()
+        dialog.setWindowTitle(title)
+        dialog.setWindowFlags(dialog.windowFlags() & ~QtCore.Qt.WindowContextHelpButtonHint)
+        dialog.setMinimumSize(500, 300)
+
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: #555555;
+                color: #ffffff;
+                border-radius: 8px;
+            }
+            QLabel {
+                background-color: transparent;
+                color: #ffffff;
+                font-size: 12pt;
+                padding: 10px;
+            }
+            QScrollArea {
+                border: none;
+                background-color: transparent;
+            }
+            QPushButton {
+                min-width: 100px;
+                font-size: 10pt;
+            }
+        """)
+
+        layout = QtWidgets.QVBoxLayout(dialog)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+
+        content_label = QtWidgets.QLabel(text)
+        content_label.setTextFormat(QtCore.Qt.RichText)
+        content_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse | QtCore.Qt.TextBrowserInteraction)
+        content_label.setWordWrap(True)
+        content_label.setOpenExternalLinks(True)
+
+        content_label.setStyleSheet("font-size: 12pt;")
+
+        scroll_area = QtWidgets.QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(content_label)
+        scroll_area.setFrameShape(QtWidgets.QFrame.NoFrame)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok)
+        button_box.accepted.connect(dialog.accept)
+
+        layout.addWidget(QtWidgets.QLabel(f"<h2 style='color:#ffffff;'>{title}</h2>"))
+        layout.addWidget(scroll_area, 1)
+        layout.addWidget(button_box)
+
+        dialog.adjustSize()
+
+        max_width = QtWidgets.QApplication.primaryScreen().availableGeometry().width() * 0.8
+        max_height = QtWidgets.QApplication.primaryScreen().availableGeometry().height() * 0.8
+        dialog.resize(min(dialog.width(), max_width), min(dialog.height(), max_height))
+
+        dialog.exec()
+
+    def show_launcher_update(self, content):
+        log("Show lau board")
+        dialog = QtWidgets.QDialog()
+        dialog.setWindowTitle("Launcher Needs Update")
+        dialog.setMinimumSize(600, 400)
+
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: #555555;
+                color: #ffffff;
+                border-radius: 8px;
+            }
+            QLabel {
+                background-color: transparent;
+                color: #ffffff;
+                font-size: 12pt;
+                padding: 10px;
+            }
+            QScrollArea {
+                border: none;
+                background-color: transparent;
+            }
+            QPushButton {
+                min-width: 100px;
+                font-size: 10pt;
+            }
+        """)
+
+        layout = QtWidgets.QVBoxLayout(dialog)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+
+        title_label = QtWidgets.QLabel("<h2 style='color:#ffffff;'>Update Board</h2>")
+        content_label = QtWidgets.QLabel(content or "Not Text")
+        content_label.setTextFormat(QtCore.Qt.RichText)
+        content_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse | QtCore.Qt.TextBrowserInteraction)
+        content_label.setWordWrap(True)
+        content_label.setOpenExternalLinks(True)
+
+        scroll_area = QtWidgets.QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(content_label)
+        scroll_area.setFrameShape(QtWidgets.QFrame.NoFrame)
+
+        button_box = QtWidgets.QDialogButtonBox()
+        update_button = QtWidgets.QPushButton("Close")
+        update_button.clicked.connect(lambda: sys.exit(0))
+        button_box.addButton(update_button, QtWidgets.QDialogButtonBox.ActionRole)
+
+        layout.addWidget(title_label)
+        layout.addWidget(scroll_area, 1)
+        layout.addWidget(button_box)
+
+        dialog.exec()
+
+    def bring_to_front(self):
+        windows = [self.progress_dialog] if self.progress_dialog else [
+            widget for widget in self.app.topLevelWidgets() if widget.isVisible()
+        ]
+        for window in windows:
+            window.showNormal()
+            window.raise_()
+            window.activateWindow()
+
+    def wait_process(self, process):
+        # 等待子进程时继续处理界面事件
+        event_loop = QtCore.QEventLoop()
+
+        timer = QtCore.QTimer()
+        timer.setInterval(100)
+
+        def check_process():
+            if process.poll() is not None:
+                timer.stop()
+                event_loop.quit()
+
+        timer.timeout.connect(check_process)
+        timer.start()
+
+        event_loop.exec()
+
+    def call_later(self, msec, callback):
+        QtCore.QTimer.singleShot(msec, callback)
+
+    def exec(self):
+        return self.app.exec()
+
+    def quit(self):
+        self.app.quit()
+
+
+class ConsoleInstallerUI(InstallerUI):
+    """--headless 使用的界面：进度和提示都写入日志，问题按命令行参数回答"""
+
     def __init__(self, app, args):
-        self.args = args
         self.app = app
+        self.args = args
+        self.title = None
+        self.reported = -1
+        self.on_cancel = None
+
+    def select_install_path(self):
+        log("No installation path given, pass --install-path to install in headless mode.")
+        return None
+
+    def show_progress(self, title, label, on_cancel):
+        self.title = title
+        self.reported = -1
+        self.on_cancel = on_cancel
+        log(f"{title}: {label}")
+
+    def update_progress(self, value):
+        # 每 10% 输出一次，避免刷屏
+        if value // 10 != self.reported // 10:
+            self.reported = value
+            log(f"{self.title or 'Progress'}: {value}%")
+
+    def close_progress(self):
+        self.title = None
+        self.on_cancel = None
+
+    def show_error(self, title, message):
+        log(f"ERROR: {title} - {message}")
+
+    def show_info(self, title, message):
+        log(f"INFO: {title} - {message}")
+
+    def ask_question(self, title, question):
+        log(f"QUESTION: {title} - {question} -> yes")
+        return True
+
+    def show_board(self, title, text):
+        log(f"{title}: {html.unescape(re.sub(r'<[^>]+>', ' ', text or '')).strip()}")
+
+    def show_launcher_update(self, content):
+        text = html.unescape(re.sub(r'<[^>]+>', ' ', content or '')).strip()
+        log(f"Launcher needs update: {text}")
+        # sys.stderr 已被 setup_logging 指向日志，脚本需要从真正的 stderr 读到更新地址
+        urls = re.findall(r'href=["\']([^"\']+)', content or '') or re.findall(r'https?://\S+', text)
+        print(f"Launcher needs update: {' '.join(urls) or text}", file=sys.__stderr__)
+        sys.exit(EXIT_LAUNCHER_OUTDATED)
+
+    def bring_to_front(self):
+        pass
+
+    def wait_process(self, process):
+        process.wait()
+
+    def call_later(self, msec, callback):
+        threading.Timer(msec / 1000, EventLoop.post, (callback,)).start()
+
+    def exec(self):
+        try:
+            return self.app.exec()
+        except KeyboardInterrupt:
+            # Ctrl+C 等同于点击进度框的取消
+            if self.on_cancel:
+                self.on_cancel()
+            return 1
+
+    def quit(self):
+        self.app.quit()
+
+
+class SilentInstaller:
+    def __init__(self, ui, args, instance=None):
+        self.args = args
+        self.ui = ui
+        self.instance = instance
         self.tmp_dir = create_tmp_folder()
         self.install_path = None
         self.python_installer_path = None
         self.release_zip_path = None
-        self.progress_dialog = None
+        self.release_url = None
+        self.release_pipeline = None
         self.current_worker = None
         self.user_cancelled = False
+        self.exit_code = 0
         self.show_announcement = True
         self.python_path = None
 
@@ -792,19 +3930,26 @@ class SilentInstaller:
                 log("lau update")
             self.install_path = get_install_path()
             self.python_path = get_python_path()
+            if install_path_overridden(self.args, self.install_path):
+                log(f"--install-path {self.args.install_path} differs from the configured installation "
+                    f"at {self.install_path}, installing to the requested path")
+                self.install_path = None
             if self.install_path and self.python_path:
                 log(f"Found existing installation at: {self.install_path}")
                 log(f"Found existing Python at: {self.python_path}")
-                self._check_for_updates()
+                if self.args.verify:
+                    self._verify_installation()
+                else:
+                    self._check_for_updates()
                 return
             else:
                 log("No existing installation found in config.")
         except Exception as e:
             log(f"Error reading config: {e}")
 
-        dialog = CustomFileDialog()
-        if dialog.exec() == QDialog.Accepted:
-            self.install_path = dialog.get_selected_path()
+        tracer.phase("select_path")
+        self.install_path = self.args.install_path or self.ui.select_install_path()
+        if self.install_path:
             # 确保路径使用反斜杠
             self.install_path = normalize_path(self.install_path)
             log(f"Selected installation path: {self.install_path}")
@@ -812,11 +3957,12 @@ class SilentInstaller:
             self._check_python()
         else:
             log("Installation cancelled by user.")
+            self.exit_code = 1
             self._quit_installer()
 
     def _stop_current_worker(self):
         """
-        停掉并等待当前线程，防止"QThread: Destroyed while thread is still running"
+        停掉并等待当前线程，防止旧线程继续运行并发出信号
         """
         if self.current_worker and self.current_worker.isRunning():
             log(f"正在停止线程: {type(self.current_worker).__name__}")
@@ -834,12 +3980,18 @@ class SilentInstaller:
                     self.current_worker.wait()
         self.current_worker = None
 
-    def _start_worker(self, worker: QThread):
+    def _start_worker(self, worker: WorkerThread):
         self._stop_current_worker()
         self.current_worker = worker
+        if tracer.enabled:
+            # 直接连接让 started/finished 在工作线程里执行，记录到该线程上
+            name = type(worker).__name__
+            worker.started.connect(lambda: tracer.begin(name, "worker"), direct=True)
+            worker.finished.connect(lambda: tracer.end(name, "worker"), direct=True)
         worker.start()
 
     def _check_python(self):
+        tracer.phase("check_python")
         log("Checking for Python installation...")
         self._show_progress_dialog("Check", "Check Python")
         worker = PythonCheckWorker()
@@ -858,6 +4010,7 @@ class SilentInstaller:
             self._download_python()
 
     def _download_python(self):
+        tracer.phase("download_python")
         log(f"Downloading Python from {PYTHON_DOWNLOAD_URL}")
         self.python_installer_path = os.path.join(self.tmp_dir, "python_installer.exe")
         self._show_progress_dialog("Download Python", "Download Python 3.11...")
@@ -870,6 +4023,7 @@ class SilentInstaller:
 
 
     def _install_python(self):
+        tracer.phase("install_python")
         self._close_progress_dialog()
         log("Installing Python...")
 
@@ -915,26 +4069,28 @@ class SilentInstaller:
             if python_installed:
                 repair_cmd = [installer_path, "/passive", "/repair"]
                 log(f"Attempting repair: {' '.join(repair_cmd)}")
-                repair_process = subprocess.Popen(
-                    repair_cmd,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                repair_process.wait()
+                with tracer.span("python installer repair", "subprocess"):
+                    repair_process = subprocess.Popen(
+                        repair_cmd,
+                        creationflags=subprocess.CREATE_NO_WINDOW,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
+                    repair_process.wait()
                 repair_success = (repair_process.returncode == 0)
 
                 if repair_success:
                     log("Repair successful. Proceeding to uninstall...")
                     uninstall_cmd = [installer_path, "/passive", "/uninstall"]
                     log(f"Attempting uninstall: {' '.join(uninstall_cmd)}")
-                    uninstall_process = subprocess.Popen(
-                        uninstall_cmd,
-                        creationflags=subprocess.CREATE_NO_WINDOW,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    uninstall_process.wait()
+                    with tracer.span("python installer uninstall", "subprocess"):
+                        uninstall_process = subprocess.Popen(
+                            uninstall_cmd,
+                            creationflags=subprocess.CREATE_NO_WINDOW,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE
+                        )
+                        uninstall_process.wait()
 
             log("Have admin rights, installing directly...")
 
@@ -954,6 +4110,7 @@ class SilentInstaller:
 
             log(f"Running Python installer with args: {' '.join(cmd_args)}")
 
+            tracer.begin("python installer", "subprocess")
             process = subprocess.Popen(
                 cmd_args,
                 creationflags=subprocess.CREATE_NO_WINDOW,
@@ -961,114 +4118,49 @@ class SilentInstaller:
                 stderr=subprocess.PIPE
             )
 
-            event_loop = QEventLoop()
-
-            timer = QTimer()
-            timer.setInterval(100)
-
-            def check_process():
-                if process.poll() is not None:
-                    timer.stop()
-                    event_loop.quit()
-
-            timer.timeout.connect(check_process)
-            timer.start()
-
-            event_loop.exec()
-
-            if process.returncode != 0:
-                stderr = process.stderr.read().decode('utf-8', errors='ignore')
-                raise Exception(f"Python installation failed with code {process.returncode}: {stderr}")
-
-            python_exe_path = os.path.join(python_install_dir, "python.exe")
-            if not os.path.exists(python_exe_path):
-                raise Exception(f"Python executable not found at {python_exe_path}")
-
-            self._store_python_path_in_registry(python_exe_path)
-            self.python_path = python_exe_path
-
-            log("Python installation completed successfully.")
-            self._download_release()
-
-        except Exception as e:
-            self._handle_error(f"Failed to install Python: {e}")
-
-    def _check_lau_update(self):
-        log("check lau version...")
-        try:
-            remote_lau_version = server_data.get("lau_version")
-            remote_lau_board = server_data.get("lau_board")
-
-            if remote_lau_version is not None and remote_lau_version > LAU_VERSION:
-                log(f"Launcher have update ({remote_lau_version})")
-                self._show_lau_board(remote_lau_board)
-                return True
-
-            log("not lau version")
-            return False
-        except Exception as e:
-            log(f"lau check update error: {e}")
-            return False
-
-    def _show_lau_board(self, content):
-        log("Show lau board")
-        dialog = QDialog()
-        dialog.setWindowTitle("Launcher Needs Update")
-        dialog.setMinimumSize(600, 400)
-
-        dialog.setStyleSheet("""
-            QDialog {
-                background-color: #555555;
-                color: #ffffff;
-                border-radius: 8px;
-            }
-            QLabel {
-                background-color: transparent;
-                color: #ffffff;
-                font-size: 12pt;
-                padding: 10px;
-            }
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QPushButton {
-                min-width: 100px;
-                font-size: 10pt;
-            }
-        """)
+            self.ui.wait_process(process)
+            tracer.end("python installer", "subprocess", returncode=process.returncode)
 
-        layout = QVBoxLayout(dialog)
-        layout.setContentsMargins(15, 15, 15, 15)
-        layout.setSpacing(10)
+            if process.returncode != 0:
+                stderr = process.stderr.read().decode('utf-8', errors='ignore')
+                raise Exception(f"Python installation failed with code {process.returncode}: {stderr}")
 
-        title_label = QLabel("<h2 style='color:#ffffff;'>Update Board</h2>")
-        content_label = QLabel(content or "Not Text")
-        content_label.setTextFormat(Qt.RichText)
-        content_label.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.TextBrowserInteraction)
-        content_label.setWordWrap(True)
-        content_label.setOpenExternalLinks(True)
+            python_exe_path = os.path.join(python_install_dir, "python.exe")
+            if not os.path.exists(python_exe_path):
+                raise Exception(f"Python executable not found at {python_exe_path}")
 
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(content_label)
-        scroll_area.setFrameShape(QFrame.NoFrame)
+            self._store_python_path_in_registry(python_exe_path)
+            self.python_path = python_exe_path
 
-        button_box = QDialogButtonBox()
-        update_button = QPushButton("Close")
-        update_button.clicked.connect(lambda: sys.exit(0))
-        button_box.addButton(update_button, QDialogButtonBox.ActionRole)
+            log("Python installation completed successfully.")
+            self._download_release()
 
-        layout.addWidget(title_label)
-        layout.addWidget(scroll_area, 1)
-        layout.addWidget(button_box)
+        except Exception as e:
+            self._handle_error(f"Failed to install Python: {e}")
 
-        dialog.exec()
+    def _check_lau_update(self):
+        log("check lau version...")
+        try:
+            data = get_server_data()
+            remote_lau_version = data.get("lau_version")
+            remote_lau_board = data.get("lau_board")
+
+            if remote_lau_version is not None and remote_lau_version > LAU_VERSION:
+                log(f"Launcher have update ({remote_lau_version})")
+                self.ui.show_launcher_update(remote_lau_board)
+                return True
+
+            log("not lau version")
+            return False
+        except Exception as e:
+            log(f"lau check update error: {e}")
+            return False
 
     def _store_python_path_in_registry(self, python_path):
         try:
-            set_python_path(python_path)
-            set_install_path(self.install_path)
+            with config_store.transaction():
+                set_python_path(python_path)
+                set_install_path(self.install_path)
 
             log(f"Stored Python path in config: {python_path}")
             log(f"Stored install path in config: {self.install_path}")
@@ -1077,58 +4169,56 @@ class SilentInstaller:
             raise
 
     def _download_release(self):
-        try:
-            self._stop_current_worker()
-            release_url = None
-            github_url = GITHUB_API_URL.format(owner=GITHUB_REPO_OWNER, repo=GITHUB_REPO_NAME)
-            try:
-                log(f"Attempting to get the latest version from GitHub: {github_url}")
-                response = requests.get(github_url, timeout=3)
-                if response.status_code == 200:
-                    data = response.json()
-                    if "zipball" in data.get('zipball_url', ''):
-                        release_url = "https://gh-proxy.com/" + data.get('zipball_url')
-                        log(f"Received download URL from GitHub: {release_url}")
-            except Exception as e:
-                log(f"Failed to get version info from GitHub: {str(e)}")
-
-            if not release_url:
-                github_url = GITHUB2_API_URL.format(owner=GITHUB_REPO_OWNER, repo=GITHUB_REPO_NAME)
-                try:
-                    log(f"Attempting to get the latest version from GitHub: {github_url}")
-                    response = requests.get(github_url, timeout=5)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "zipball" in data.get('zipball_url', ''):
-                            release_url = data.get('zipball_url')
-                            log(f"Received download URL from GitHub: {release_url}")
-                except Exception as e:
-                    log(f"Failed to get version info from GitHub: {str(e)}")
-
-            if not release_url:
-                log(f"Failed to get info from GitHub")
-                raise
+        tracer.phase("download_release")
+        log("Getting latest release info...")
+        self._show_progress_dialog("Download Application", "Checking the latest version...")
+        worker = ReleaseInfoWorker()
+        worker.signals.log.connect(log)
+        worker.signals.result.connect(self._start_release_download)
+        worker.signals.error.connect(lambda message: self._handle_error(f"Failed to get release info: {message}"))
+        self._start_worker(worker)
 
-            self.release_zip_path = os.path.join(self.tmp_dir, "release.zip")
-            self._show_progress_dialog("Download Application", "Downloading the latest version...")
-            worker = DownloadWorker(release_url, self.release_zip_path)
+    def _start_release_download(self, release_url):
+        self.release_url = release_url
+        final_path = os.path.join(self.install_path, "exvr")
+        if get_delta_updates_enabled() and os.path.exists(os.path.join(final_path, "main.py")):
+            log("Existing installation found, trying delta update...")
+            self._show_progress_dialog("Update Application", "Downloading changed files...")
+            worker = DeltaUpdateWorker(release_url, final_path)
             worker.signals.log.connect(log)
             worker.signals.progress.connect(self._update_progress)
-            worker.signals.error.connect(self._handle_error)
-            worker.signals.finished.connect(self._extract_release)
+            worker.signals.result.connect(self._handle_delta_result)
             self._start_worker(worker)
-        except Exception as e:
-            self._handle_error(f"Failed to get release info: {e}")
+            return
+        self._download_full_release(release_url)
+
+    def _handle_delta_result(self, result):
+        if result == "applied":
+            self._install_requirements()
+        else:
+            self._download_full_release(self.release_url)
+
+    def _download_full_release(self, release_url):
+        self.release_zip_path = os.path.join(self.tmp_dir, "release.zip")
+        self._show_progress_dialog("Download Application", "Downloading the latest version...")
+        # 边下载边解压到暂存目录，核对通过前不动现有的安装
+        self.release_pipeline = StreamingZipExtractor(prepare_release_staging(os.path.join(self.install_path, "exvr")))
+        worker = DownloadWorker(release_url, self.release_zip_path, pipeline=self.release_pipeline)
+        worker.signals.log.connect(log)
+        worker.signals.progress.connect(self._update_progress)
+        worker.signals.error.connect(self._handle_error)
+        worker.signals.finished.connect(self._extract_release)
+        self._start_worker(worker)
 
     def _extract_release(self):
+        tracer.phase("extract_release")
         log("Extracting release...")
-        extract_path = os.path.join(self.tmp_dir, "extract")
         final_path = os.path.join(self.install_path, "exvr")
-        os.makedirs(extract_path, exist_ok=True)
         os.makedirs(final_path, exist_ok=True)
 
         self._show_progress_dialog("Extract files", "Unzipping application files...")
-        worker = ExtractWorker(self.release_zip_path, extract_path, final_path)
+        worker = ExtractWorker(self.release_zip_path, None, final_path, pipeline=self.release_pipeline,
+                               source_url=self.release_url)
         worker.signals.log.connect(log)
         worker.signals.progress.connect(self._update_progress)
         worker.signals.error.connect(self._handle_error)
@@ -1136,6 +4226,7 @@ class SilentInstaller:
         self._start_worker(worker)
 
     def _install_requirements(self):
+        tracer.phase("install_requirements")
         log("Installing requirements...")
         requirements_path = os.path.join(self.install_path, "exvr", "requirements.txt")
         if not os.path.exists(requirements_path):
@@ -1153,15 +4244,17 @@ class SilentInstaller:
         self._start_worker(worker)
 
     def _register_application(self):
+        tracer.phase("register_application")
         self._close_progress_dialog()
         log("Registering application...")
         try:
-            # 存储安装路径到JSON配置
-            set_install_path(self.install_path)
+            with config_store.transaction():
+                # 存储安装路径到JSON配置
+                set_install_path(self.install_path)
 
-            # 确保Python路径已存储
-            if self.python_path and os.path.exists(self.python_path):
-                set_python_path(self.python_path)
+                # 确保Python路径已存储
+                if self.python_path and os.path.exists(self.python_path):
+                    set_python_path(self.python_path)
 
             log("Application registered successfully.")
             self._run_application()
@@ -1169,30 +4262,32 @@ class SilentInstaller:
             self._handle_error(f"Failed to register application: {e}")
 
     def _check_for_updates(self):
+        tracer.phase("check_for_updates")
         log("Checking for updates...")
         try:
-            remote_version = server_data.get("version")
+            remote_version = get_server_data().get("version")
 
             if not remote_version:
                 log("Failed to get remote version. Running current version.")
                 self._run_application()
                 return
 
-            config_path = os.path.join(self.install_path, "exvr", "settings", "config.json")
             local_version = None
-            if os.path.exists(config_path):
-                try:
-                    with open(config_path, "r") as f:
-                        local_version = json.load(f).get("Version")
-                    log(f"Local version: {local_version}")
-                except Exception as e:
-                    log(f"Error reading local config: {e}")
+            try:
+                local_version = get_local_version(self.install_path)
+                log(f"Local version: {local_version}")
+            except Exception as e:
+                log(f"Error reading local config: {e}")
 
             if not local_version or local_version != remote_version:
                 log(f"Update available: Local={local_version}, Remote={remote_version}")
-                reply = ask_question("Have Update",
-                                     f"Have new version ({remote_version}). Do you want to update?")
-                if reply == QMessageBox.Yes:
+                if self.args.update:
+                    update = self.args.update == "always"
+                    log(f"Update policy: {self.args.update}")
+                else:
+                    update = self.ui.ask_question("Have Update",
+                                                  f"Have new version ({remote_version}). Do you want to update?")
+                if update:
                     log("User chose to update.")
                     self._update_application()
                 else:
@@ -1207,14 +4302,40 @@ class SilentInstaller:
             log(f"Update check process failed: {e}. Running application.")
             self._run_application()
 
+    def _verify_installation(self):
+        tracer.phase("verify_installation")
+        log("Verifying installation...")
+        self._show_progress_dialog("Verify", "Verifying installed files...")
+        worker = VerifyWorker(os.path.join(self.install_path, "exvr"))
+        worker.signals.log.connect(log)
+        worker.signals.progress.connect(self._update_progress)
+        worker.signals.error.connect(self._handle_error)
+        worker.signals.result.connect(self._handle_verify_result)
+        self._start_worker(worker)
+
+    def _handle_verify_result(self, result):
+        mismatched = json.loads(result)
+        if mismatched is None:
+            log("No install manifest, reinstalling the latest release.")
+            self._download_release()
+        elif not mismatched:
+            log("All installed files verified.")
+            self.show_announcement = False
+            self._run_application()
+        else:
+            source = load_release_manifest(os.path.join(self.install_path, "exvr")).get("source")
+            log(f"Repairing {len(mismatched)} files from {source or 'the latest release'}")
+            if source:
+                self._start_release_download(source)
+            else:
+                self._download_release()
+
     def _update_application(self):
         log("Starting application update...")
         self._download_release()
 
     def _run_application(self):
-        app_log_dir = get_resource_path("logs")
-        os.makedirs(app_log_dir, exist_ok=True)
-
+        tracer.phase("run_application")
         log("Preparing to run application...")
         clean_tmp_folder(self.tmp_dir)
 
@@ -1222,65 +4343,7 @@ class SilentInstaller:
             self._show_announcement_box()
 
         try:
-            exvr_path = os.path.join(self.install_path, "exvr")
-            python_path = os.path.join(self.install_path, "python")
-            venv_path = os.path.join(exvr_path, "venv", "Scripts")
-            main_script = os.path.join(exvr_path, "main.py")
-            venv_python = os.path.join(venv_path, "python.exe")
-            requirements_file = os.path.join(exvr_path, "requirements.txt")
-            if not os.path.exists(python_path):
-                raise FileNotFoundError(f"Python not found at {python_path}")
-            if not os.path.exists(venv_python):
-                raise FileNotFoundError(f"Virtual environment Python not found at {venv_python}")
-            if not os.path.exists(main_script):
-                raise FileNotFoundError("Main application script not found.")
-            if not os.path.exists(requirements_file):
-                raise FileNotFoundError("Requirements not found.")
-
-            result = subprocess.run(
-                [venv_python, "-m", "pip", "list", "--format=json"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            installed = {pkg["name"].lower(): pkg["version"] for pkg in json.loads(result.stdout)}
-            required = {}
-            from packaging.requirements import Requirement
-            with open(requirements_file, encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        req = Requirement(line)
-                        required[req.name.lower()] = req
-            for name, req in required.items():
-                if name not in installed:
-                    log(f"Required packages missing: {name}")
-                    raise
-
-            log(f"Running command: {venv_python} {main_script}")
-            os.chdir(exvr_path)
-
-            flags = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_CONSOLE
-
-            log("Using CREATE_NO_WINDOW flag to hide initial console only")
-
-            # 检查是否有-log参数
-            cmd = [venv_python, main_script, "--log-dir", app_log_dir]
-            if self.args.log:
-                cmd.append("-log")
-
-            process = subprocess.Popen(
-                cmd,
-                creationflags=flags,
-                close_fds=True,
-                shell=False,
-                stdin=None,
-                stdout=None,
-                stderr=None
-            )
-
-            time.sleep(1)
-
+            launch_application(self.install_path, self.args)
             log("Application launched. Exiting installer.")
             self._quit_installer()
 
@@ -1290,7 +4353,7 @@ class SilentInstaller:
 
     def _show_announcement_box(self):
         log("Fetching announcement board...")
-        board_data = server_data.get("board")
+        board_data = get_server_data().get("board")
         if not board_data:
             log("No valid announcement board found")
             return
@@ -1300,78 +4363,16 @@ class SilentInstaller:
 
         log(f"Showing announcement: {title}")
 
-        dialog = QDialog()
-        dialog.setWindowTitle(title)
-        dialog.setWindowFlags(dialog.windowFlags() & ~Qt.WindowContextHelpButtonHint)
-        dialog.setMinimumSize(500, 300)
-
-        dialog.setStyleSheet("""
-            QDialog {
-                background-color: #555555;
-                color: #ffffff;
-                border-radius: 8px;
-            }
-            QLabel {
-                background-color: transparent;
-                color: #ffffff;
-                font-size: 12pt;
-                padding: 10px;
-            }
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QPushButton {
-                min-width: 100px;
-                font-size: 10pt;
-            }
-        """)
-
-        layout = QVBoxLayout(dialog)
-        layout.setContentsMargins(15, 15, 15, 15)
-        layout.setSpacing(10)
-
-        content_label = QLabel(text)
-        content_label.setTextFormat(Qt.RichText)
-        content_label.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.TextBrowserInteraction)
-        content_label.setWordWrap(True)
-        content_label.setOpenExternalLinks(True)
-
-        content_label.setStyleSheet("font-size: 12pt;")
-
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(content_label)
-        scroll_area.setFrameShape(QFrame.NoFrame)
-
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok)
-        button_box.accepted.connect(dialog.accept)
-
-        layout.addWidget(QLabel(f"<h2 style='color:#ffffff;'>{title}</h2>"))
-        layout.addWidget(scroll_area, 1)
-        layout.addWidget(button_box)
-
-        dialog.adjustSize()
-
-        max_width = QApplication.primaryScreen().availableGeometry().width() * 0.8
-        max_height = QApplication.primaryScreen().availableGeometry().height() * 0.8
-        dialog.resize(min(dialog.width(), max_width), min(dialog.height(), max_height))
-
-        dialog.exec()
+        self.ui.show_board(title, text)
 
     def _show_progress_dialog(self, title, label):
-        self._close_progress_dialog()
-        self.progress_dialog = QProgressDialog(label, "Cancel", 0, 100, None)
-        self.progress_dialog.setWindowTitle(title)
-        self.progress_dialog.setWindowModality(Qt.WindowModal)
-        self.progress_dialog.setAutoClose(False)
-        self.progress_dialog.setAutoReset(False)
-
-        self.progress_dialog.canceled.connect(self._handle_cancel_click)
+        self.ui.show_progress(title, label, self._handle_cancel_click)
+        self._publish("progress", title=title, label=label, value=0)
 
-        self.progress_dialog.setValue(0)
-        self.progress_dialog.show()
-        self.app.processEvents()
+    def _publish(self, event, **fields):
+        # 转发给通过 LauncherInstance 连接进来的其他启动器
+        if self.instance is not None:
+            self.instance.publish(event, **fields)
 
     def _handle_cancel_click(self):
         log("Cancel button clicked by user.")
@@ -1379,57 +4380,611 @@ class SilentInstaller:
         if self.current_worker:
             self.current_worker.stop()
         self._close_progress_dialog()
-        show_info_message("Cancelled", "The operation has been canceled by the user.")
+        self.ui.show_info("Cancelled", "The operation has been canceled by the user.")
         self._quit_installer()
 
     def _update_progress(self, value):
-        if self.progress_dialog and not self.user_cancelled:
-            self.progress_dialog.setValue(value)
-            self.app.processEvents()
+        if not self.user_cancelled:
+            self.ui.update_progress(value)
+            self._publish("progress", value=value)
 
     def _close_progress_dialog(self):
-        if self.progress_dialog:
-            try:
-                self.progress_dialog.canceled.disconnect()
-            except:
-                pass
-
-            self.progress_dialog.close()
-            self.progress_dialog = None
+        self.ui.close_progress()
+        self._publish("closed")
 
     def _handle_error(self, message):
         log(f"Handling error: {message}")
         self._close_progress_dialog()
         if self.current_worker:
             self.current_worker.stop()
-        show_error_message("Installation Error", message)
+        self.exit_code = 1
+        self._publish("error", title="Installation Error", message=message)
+        self.ui.show_error("Installation Error", message)
         self._quit_installer()
 
     def _quit_installer(self):
         log("Quitting installer application.")
         self._stop_current_worker()  # <== 新增
         clean_tmp_folder(self.tmp_dir)
-        self.app.quit()
+        tracer.finish()
+        self.ui.quit()
 
-def get_server_data():
-    global server_data
-    for url in UPDATE_CHECK_URLS:
+def fetch_json_from_mirror(url, results, cancelled, timeout=SERVER_DATA_TIMEOUT, cache=None):
+    start = time.time()
+    data = None
+    try:
+        headers = cache.headers(url) if cache is not None else {}
+        with requests.get(url, timeout=timeout, stream=True, headers=headers) as response:
+            if response.status_code == 304 and cache is not None:
+                data = cache.revalidated(url)
+                if data is None:
+                    raise Exception("not modified, but nothing is cached")
+                outcome = "not modified"
+            else:
+                response.raise_for_status()
+                body = b""
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if cancelled.is_set():
+                        raise Exception("cancelled, another mirror answered first")
+                    if time.time() - start > timeout:
+                        raise Exception(f"deadline of {timeout}s exceeded")
+                    body += chunk
+                data = json.loads(body)
+                if not isinstance(data, dict):
+                    raise ValueError("response is not a JSON object")
+                if cache is not None:
+                    cache.store(url, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                outcome = "ok"
+    except Exception as e:
+        data = None
+        outcome = f"failed: {e}"
+    elapsed = int((time.time() - start) * 1000)
+    log(f"Mirror {url}: {outcome} ({elapsed} ms)")
+    results.put((url, data))
+
+
+def race_json_requests(urls, timeout, budget, is_valid=None, cache=None):
+    """并发请求所有地址，返回第一个有效的 (url, JSON)，其余请求取消
+
+    传入 cache 时，TTL 内的缓存直接返回不发请求，所有地址都失败时返回过期的缓存
+    """
+    if cache is not None and cache.ttl > 0:
+        url, data = cache.newest(urls, is_valid, max_age=cache.ttl)
+        if data is not None:
+            log(f"Using cached {url}, fetched less than {cache.ttl}s ago")
+            return url, data
+
+    results = queue.Queue()
+    cancelled = threading.Event()
+    for url in urls:
+        threading.Thread(target=fetch_json_from_mirror, args=(url, results, cancelled, timeout, cache),
+                         daemon=True).start()
+
+    deadline = time.time() + budget
+    pending = len(urls)
+    try:
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                log(f"No mirror answered within {budget}s")
+                break
+            try:
+                url, data = results.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            pending -= 1
+            if data is None:
+                continue
+            if is_valid is None or is_valid(data):
+                return url, data
+            log(f"Mirror {url}: unexpected payload, ignored")
+    finally:
+        cancelled.set()
+
+    if cache is not None:
+        url, data = cache.newest(urls, is_valid)
+        if data is not None:
+            log(f"All mirrors failed, using the stale cached copy of {url}")
+            return url, data
+    return None, None
+
+
+def is_release_outdated(tag_name, server_version):
+    """发布信息的 tag 是否比服务器数据中的版本旧，无法解析时只要不同就视为旧"""
+    from packaging.version import InvalidVersion, Version
+
+    if not server_version:
+        return False
+    if not tag_name:
+        return True
+    tag_name, server_version = str(tag_name).lstrip("vV"), str(server_version).lstrip("vV")
+    try:
+        return Version(server_version) > Version(tag_name)
+    except InvalidVersion:
+        return server_version != tag_name
+
+
+def get_release_endpoints():
+    # 发布信息地址 -> 下载 zipball 时使用的代理前缀
+    endpoints = {
+        GITHUB_API_URL.format(owner=GITHUB_REPO_OWNER, repo=GITHUB_REPO_NAME): GITHUB_PROXY,
+        GITHUB2_API_URL.format(owner=GITHUB_REPO_OWNER, repo=GITHUB_REPO_NAME): "",
+    }
+    for proxy in get_github_proxies():
+        proxy = proxy.rstrip("/") + "/"
+        endpoints[proxy + GITHUB2_API_URL.format(owner=GITHUB_REPO_OWNER, repo=GITHUB_REPO_NAME)] = proxy
+    return endpoints
+
+
+def probe_pip_mirror(mirror):
+    # 测量首字节时间并读取一小段 /simple/ 索引
+    start = time.time()
+    try:
+        with requests.get(mirror, timeout=PIP_MIRROR_PROBE_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            ttfb = time.time() - start
+            received = 0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if received >= PIP_MIRROR_PROBE_BYTES or time.time() - start > PIP_MIRROR_PROBE_TIMEOUT:
+                    break
+        return {"mirror": mirror, "ok": True, "ttfb": ttfb, "latency": time.time() - start, "bytes": received}
+    except Exception as e:
+        return {"mirror": mirror, "ok": False, "latency": PIP_MIRROR_PROBE_TIMEOUT, "error": str(e)}
+
+
+def update_pip_mirror_health(health, mirror, ok, latency=None):
+    # 历史记录按半衰期衰减，越久以前的结果权重越低
+    now = time.time()
+    entry = health.get(mirror)
+    if entry:
+        decay = 0.5 ** ((now - entry.get("updated", now)) / PIP_MIRROR_HALF_LIFE)
+        weight = PIP_MIRROR_HISTORY_WEIGHT * decay
+    else:
+        entry = {}
+        weight = 0
+    entry["success"] = weight * entry.get("success", 1.0) + (1 - weight) * (1.0 if ok else 0.0)
+    if latency is not None:
+        entry["latency"] = weight * entry.get("latency", latency) + (1 - weight) * latency
+    entry["updated"] = now
+    health[mirror] = entry
+    return health
+
+
+def pip_mirror_score(health, mirror):
+    entry = health.get(mirror)
+    if not entry:
+        return PIP_MIRROR_PROBE_TIMEOUT
+    return entry.get("latency", PIP_MIRROR_PROBE_TIMEOUT) / max(entry.get("success", 0.0), 0.05)
+
+
+def rank_pip_mirrors(mirrors, emit_log=log):
+    """并发探测所有 pip 镜像，按延迟和成功率排序，结果写入配置供下次使用"""
+    results = queue.Queue()
+    for mirror in mirrors:
+        threading.Thread(target=lambda m=mirror: results.put(probe_pip_mirror(m)), daemon=True).start()
+
+    health = get_pip_mirror_health()
+    deadline = time.time() + PIP_MIRROR_PROBE_TIMEOUT + 1
+    for _ in mirrors:
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
+            probe = results.get(timeout=max(deadline - time.time(), 0.01))
+        except queue.Empty:
+            break
+        if probe["ok"]:
+            emit_log(f"Mirror probe {probe['mirror']}: ttfb {int(probe['ttfb'] * 1000)} ms, "
+                     f"{probe['bytes']} bytes in {int(probe['latency'] * 1000)} ms")
+        else:
+            emit_log(f"Mirror probe {probe['mirror']}: failed: {probe['error']}")
+        update_pip_mirror_health(health, probe["mirror"], probe["ok"], probe["latency"])
+
+    ranked = sorted(mirrors, key=lambda m: pip_mirror_score(health, m))
+    try:
+        set_pip_mirror_health(health)
+    except Exception as e:
+        emit_log(f"Error saving pip mirror health: {e}")
+    emit_log(f"Pip mirror order: {ranked}")
+    return ranked
+
+
+def record_pip_mirror_result(mirror, ok):
+    try:
+        set_pip_mirror_health(update_pip_mirror_health(get_pip_mirror_health(), mirror, ok))
+    except Exception as e:
+        log(f"Error saving pip mirror health: {e}")
+
+
+def get_wheel_tags(python_version):
+    from packaging import tags
+    version = tuple(int(part) for part in python_version.split(".")[:2])
+    platforms = list(tags.platform_tags())
+    return list(tags.cpython_tags(version, platforms=platforms)) + list(tags.compatible_tags(version, platforms=platforms))
+
+
+def fetch_simple_index(mirror, name):
+    """读取 PEP 503 simple 索引页，返回 [{filename, url, sha256, requires_python, yanked}]"""
+    url = f"{mirror.rstrip('/')}/{normalize_package_name(name)}/"
+    response = requests.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    links = []
+    for attrs, filename in re.findall(r"<a\s+([^>]*)>([^<]+)</a>", response.text):
+        href = re.search(r'href="([^"]+)"', attrs)
+        if not href:
+            continue
+        link_url, _, fragment = html.unescape(href.group(1)).partition("#")
+        requires_python = re.search(r'data-requires-python="([^"]*)"', attrs)
+        links.append({
+            "filename": filename.strip(),
+            "url": urljoin(response.url, link_url),
+            "sha256": fragment[len("sha256="):] if fragment.startswith("sha256=") else None,
+            "requires_python": html.unescape(requires_python.group(1)) if requires_python else None,
+            "yanked": "data-yanked" in attrs,
+        })
+    return links
+
+
+def select_wheel(requirement, links, wheel_tags, python_version):
+    """选出满足版本约束的最高版本中，与目标平台最匹配的 wheel"""
+    from packaging.specifiers import SpecifierSet, InvalidSpecifier
+    from packaging.utils import parse_wheel_filename, InvalidWheelFilename
+
+    priority = {tag: i for i, tag in enumerate(wheel_tags)}
+    best_key, best_link = None, None
+    for link in links:
+        if not link["filename"].endswith(".whl") or link["yanked"]:
+            continue
+        try:
+            _, version, _, tags_of_wheel = parse_wheel_filename(link["filename"])
+            if link["requires_python"] and not SpecifierSet(link["requires_python"]).contains(python_version):
+                continue
+        except (InvalidWheelFilename, InvalidSpecifier):
+            continue
+        if not requirement.specifier.contains(version):
+            continue
+        rank = min((priority[tag] for tag in tags_of_wheel if tag in priority), default=None)
+        if rank is None:
+            continue
+        key = (version, -rank)
+        if best_key is None or key > best_key:
+            best_key, best_link = key, link
+    return best_link
+
+
+def download_wheel(link, folder, is_running=lambda: True):
+    path = os.path.join(folder, link["filename"])
+    if os.path.exists(path) and (not link["sha256"] or file_sha256(path) == link["sha256"]):
+        return False
+    temp_path = path + ".part"
+    digest = hashlib.sha256()
+    with requests.get(link["url"], stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        with open(temp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if not is_running():
+                    raise Exception("Prefetch cancelled")
+                f.write(chunk)
+                digest.update(chunk)
+    if link["sha256"] and digest.hexdigest() != link["sha256"]:
+        os.remove(temp_path)
+        raise Exception(f"Hash mismatch for {link['filename']}")
+    os.replace(temp_path, path)
+    return True
+
+
+def prefetch_wheels(lines, venv_path, mirrors, folder, is_running=lambda: True, emit_log=log,
+                    workers=PIP_PREFETCH_WORKERS):
+    """并发从多个镜像预先下载顶层依赖的 wheel，之后 pip 通过 --find-links 直接使用，返回下载的文件名"""
+    from packaging.requirements import Requirement
+
+    health = get_pip_mirror_health()
+    healthy = [mirror for mirror in mirrors if health.get(mirror, {}).get("success", 1.0) >= 0.5] or mirrors
+    python_version = get_venv_python_version(venv_path) or PIP_TARGET_PYTHON
+    wheel_tags = get_wheel_tags(python_version)
+    environment = get_marker_environment(venv_path)
+    requirements = []
+    for line in lines:
+        requirement = Requirement(line)
+        if requirement.url or (requirement.marker and not requirement.marker.evaluate(environment)):
+            continue
+        requirements.append(requirement)
+    if not requirements or not healthy:
+        return []
+    os.makedirs(folder, exist_ok=True)
+
+    def fetch(index, requirement):
+        # 按序号把文件分散到各个镜像，失败时换下一个镜像
+        for attempt in range(len(healthy)):
+            if not is_running():
+                return None
+            mirror = healthy[(index + attempt) % len(healthy)]
+            try:
+                link = select_wheel(requirement, fetch_simple_index(mirror, requirement.name), wheel_tags,
+                                    python_version)
+                if link is None:
+                    emit_log(f"Prefetch: no compatible wheel for {requirement} on {mirror}")
+                    continue
+                if download_wheel(link, folder, is_running):
+                    emit_log(f"Prefetched {link['filename']} from {mirror}")
+                return link["filename"]
+            except Exception as e:
+                emit_log(f"Prefetch of {requirement.name} from {mirror} failed: {e}")
+        return None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch, i, requirement) for i, requirement in enumerate(requirements)]
+        return [name for name in (future.result() for future in futures) if name]
+
+
+def get_pip_version(venv_path):
+    version = read_installed_distributions(get_site_packages_dirs(venv_path)).get("pip")
+    try:
+        return tuple(int(part) for part in version.split(".")[:2])
+    except (AttributeError, ValueError):
+        return (0, 0)
+
+
+def get_interpreter_version(python_path):
+    """解释器的完整 sys.version，包含补丁版本和构建信息"""
+    if not python_path or not os.path.exists(python_path):
+        return None
+    try:
+        with tracer.span("python sys.version", "subprocess", command=python_path):
+            result = subprocess.run(
+                [python_path, "-c", "import sys; print(sys.version)"],
+                capture_output=True, text=True, timeout=PYTHON_CHECK_TIMEOUT,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        result.check_returncode()
+        return result.stdout.strip() or None
+    except Exception as e:
+        log(f"Failed to get interpreter version of {python_path}: {e}")
+        return None
+
+
+def local_download_sizes(report, folder):
+    """--report 中已在 wheelhouse 里的文件直接读取大小，其余的在下载时由 pip 的进度输出给出"""
+    sizes = {}
+    for item in report.get("install", []):
+        url = item.get("download_info", {}).get("url")
+        if not url:
+            continue
+        path = os.path.join(folder, unquote(urlsplit(url).path.rsplit("/", 1)[-1]))
+        if os.path.isfile(path) and os.path.getsize(path):
+            sizes[url] = os.path.getsize(path)
+    return sizes
+
+
+def start_server_data_fetch():
+    """进程启动时在后台请求服务器数据，和读取配置、加载 Qt、检查 Python 并行进行"""
+    global server_data_future, server_data_deadline
+    future = concurrent.futures.Future()
+
+    def fetch():
+        data = None
+        try:
+            with tracer.span("fetch server data", "network") as span:
+                # 结果写入元数据缓存，即使错过了本次的截止时间也留给下次启动使用
+                url, data = race_json_requests(UPDATE_CHECK_URLS, SERVER_DATA_TIMEOUT, SERVER_DATA_BUDGET,
+                                               cache=MetadataCache())
+                span["url"] = url
+            if data is not None:
                 log(f"Get Json form {url}")
-                server_data = response.json()
-                break
+            else:
+                log("get server data error: all mirrors failed")
         except Exception as e:
             log(f"get server data error: {e}")
+        finally:
+            future.set_result(data)
+
+    server_data_future = future
+    server_data_deadline = time.time() + SERVER_DATA_DEADLINE
+    threading.Thread(target=fetch, name="server-data", daemon=True).start()
+
+
+def get_server_data():
+    """第一次使用时等待后台请求直到截止时间，超时或失败则沿用上次缓存的数据，更新提示留到下次启动"""
+    global server_data, server_data_future
+    if server_data_future is None:
+        return server_data
+    future, server_data_future = server_data_future, None
+    remaining = max(0, server_data_deadline - time.time())
+    with tracer.span("wait server data", "startup", deadline=SERVER_DATA_DEADLINE) as span:
+        try:
+            data = future.result(timeout=remaining)
+        except concurrent.futures.TimeoutError:
+            data = None
+            log(f"Server data not ready within {SERVER_DATA_DEADLINE}s, using the cached copy")
+        span["fresh"] = data is not None
+    if data is None:
+        data = MetadataCache().newest(UPDATE_CHECK_URLS)[1] or {}
+    server_data = data
+    return server_data
+
+class LauncherInstance:
+    """单实例锁和本地 IPC：第二次启动时连接到正在运行的启动器，而不是重复下载和安装
+
+    锁由操作系统持有，进程崩溃后自动释放；崩溃留下的实例信息文件在下次获取锁时被覆盖
+    """
+
+    def __init__(self, folder=None):
+        folder = folder or os.path.dirname(config_store.path)
+        self.lock_path = os.path.join(folder, INSTANCE_LOCK_NAME)
+        self.info_path = os.path.join(folder, INSTANCE_INFO_NAME)
+        self.on_activate = None
+        self._lock = contextlib.ExitStack()
+        self._server = None
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._state = None
+        self._connection = None
+
+    def _read_info(self):
+        try:
+            with open(self.info_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _connect(self):
+        info = self._read_info()
+        if not info:
+            return None
+        try:
+            return socket.create_connection(("127.0.0.1", info["port"]), timeout=INSTANCE_IO_TIMEOUT), info
+        except OSError:
+            return None
+
+    def acquire(self):
+        """成为主实例时返回 True，已有实例在运行且能连上时返回 False"""
+        deadline = time.time() + INSTANCE_CONNECT_TIMEOUT
+        while True:
+            try:
+                self._lock.enter_context(file_lock(self.lock_path, 0))
+            except TimeoutError:
+                pass
+            else:
+                self._serve()
+                return True
+            # 持有锁的实例可能刚启动还没写出端口，或者正在退出
+            self._connection = self._connect()
+            if self._connection:
+                return False
+            if time.time() > deadline:
+                info = self._read_info() or {}
+                raise Exception(f"launcher process {info.get('pid')} holds {self.lock_path} but does not answer")
+            time.sleep(0.2)
+
+    def _serve(self):
+        stale = self._read_info()
+        if stale:
+            log(f"Recovered the instance lock left behind by process {stale.get('pid')}")
+        self._token = os.urandom(16).hex()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        threading.Thread(target=self._accept_loop, name="instance-server", daemon=True).start()
+        write_json_atomic(self.info_path, {
+            "pid": os.getpid(), "port": self._server.getsockname()[1], "token": self._token
+        })
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+    def _send(self, conn, message):
+        try:
+            conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+            return True
+        except OSError:
+            return False
+
+    def _handle_client(self, conn):
+        try:
+            conn.settimeout(INSTANCE_IO_TIMEOUT)
+            with conn.makefile("rb") as f:
+                request = json.loads(f.readline() or b"{}")
+            if request.get("token") != self._token:
+                raise Exception("bad token")
+        except Exception as e:
+            log(f"Rejected instance connection: {e}")
+            conn.close()
+            return
+        log("Another launcher was started and attached to this one.")
+        if self.on_activate:
+            EventLoop.post(self.on_activate)
+        with self._clients_lock:
+            if not self._send(conn, {"event": "attached", "pid": os.getpid()}) or not request.get("stream"):
+                conn.close()
+                return
+            if self._state:
+                self._send(conn, self._state)
+            self._clients.append(conn)
+
+    def publish(self, event, **fields):
+        if self._server is None:
+            return
+        with self._clients_lock:
+            if event == "progress":
+                message = dict(self._state or {"event": "progress"}, **fields)
+                if message == self._state:
+                    return
+                self._state = message
+            else:
+                message = dict(fields, event=event)
+                if event == "closed":
+                    self._state = None
+            for conn in list(self._clients):
+                if not self._send(conn, message):
+                    self._clients.remove(conn)
+                    conn.close()
+
+    def release(self, code):
+        if self._server is None:
+            return
+        if not isinstance(code, int):
+            code = 0 if code is None else 1
+        self.publish("exit", code=code)
+        with self._clients_lock:
+            for conn in self._clients:
+                conn.close()
+            self._clients = []
+        self._server.close()
+        self._server = None
+        # 先删除实例信息再释放锁，残留的信息文件说明上一个进程没有正常退出
+        try:
+            os.remove(self.info_path)
+        except OSError:
+            pass
+        self._lock.close()
+
+    def attach(self, ui=None):
+        """让正在运行的实例显示到前台；传入 ui 时转发它的进度直到它退出，返回退出码"""
+        conn, info = self._connection
+        if sys.platform == "win32":
+            # 允许对方把窗口切到前台
+            ctypes.windll.user32.AllowSetForegroundWindow(info["pid"])
+        title = None
+        try:
+            with conn, conn.makefile("rb") as f:
+                conn.sendall((json.dumps({"token": info["token"], "stream": ui is not None}) + "\n").encode("utf-8"))
+                if ui is not None:
+                    conn.settimeout(None)
+                for line in f:
+                    message = json.loads(line)
+                    event = message.pop("event")
+                    if event == "attached":
+                        log(f"The launcher is already running (process {message['pid']}), attached to it.")
+                        if ui is None:
+                            return 0
+                    elif event == "progress":
+                        if message.get("title") != title:
+                            title = message.get("title")
+                            ui.show_progress(title, message.get("label"), None)
+                        ui.update_progress(message.get("value", 0))
+                    elif event == "closed":
+                        title = None
+                        ui.close_progress()
+                    elif event == "error":
+                        ui.show_error(message["title"], message["message"])
+                    elif event == "exit":
+                        log(f"The running launcher exited with code {message['code']}.")
+                        return message["code"]
+        except KeyboardInterrupt:
+            return 1
+        except Exception as e:
+            log(f"Lost connection to the running launcher: {e}")
+            return 1
+        log("The running launcher closed the connection.")
+        return 1
+
 
 def main():
     global release
-    config = load_config()
-    if config.get("release") is None:
-        release = "live"
-    else:
-        release = config.get("release")
+    release = config_store.get("release") or "live"
 
     if release == "beta":
         log(f"release is beta")
@@ -1437,26 +4992,60 @@ def main():
         GITHUB_API_URL = ""
         GITHUB2_API_URL = ""
 
-    get_server_data()
     args = parse_arguments()
+    if args.trace:
+        tracer.enable()
+    start_server_data_fetch()
 
     setup_logging(args)
+    tracer.phase("startup")
 
     log("Main function started.")
+    instance = LauncherInstance()
     try:
-        QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
-    except AttributeError:
-        pass
+        primary = instance.acquire()
+    except Exception as e:
+        log(f"Cannot coordinate with the running launcher: {e}")
+        sys.exit(1)
+    if not primary:
+        sys.exit(instance.attach(ConsoleInstallerUI(EventLoop(), args) if args.headless else None))
+
+    try:
+        run_launcher(args, instance)
+    except SystemExit as e:
+        instance.release(e.code)
+        raise
+    except BaseException:
+        instance.release(1)
+        raise
+
+
+def run_launcher(args, instance):
+    if not args.verify and warm_launch(args):
+        tracer.finish()
+        sys.exit(0)
+
+    if args.headless:
+        ui = ConsoleInstallerUI(EventLoop(), args)
+    else:
+        tracer.phase("load_qt")
+        try:
+            QtWidgets.QApplication.setHighDpiScaleFactorRoundingPolicy(
+                QtCore.Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+        except AttributeError:
+            pass
 
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")
+        app = QtWidgets.QApplication(sys.argv)
+        app.setStyle("Fusion")
 
-    app.setStyleSheet(modern_qss)
+        app.setStyleSheet(modern_qss)
+        ui = QtInstallerUI(app)
+    instance.on_activate = ui.bring_to_front
 
-    installer = SilentInstaller(app, args)
-    QTimer.singleShot(100, installer.run)
+    installer = SilentInstaller(ui, args, instance)
+    ui.call_later(100, installer.run)
 
-    sys.exit(app.exec())
+    sys.exit(ui.exec() or installer.exit_code)
 
 if __name__ == "__main__":
     main()
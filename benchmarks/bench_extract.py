@@ -0,0 +1,94 @@
+"""对比原来的逐个解压+复制流程与并行解压引擎
+
+python benchmarks/bench_extract.py [--small-files 3000] [--large-files 8] [--workers 1 2 4 8]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ExVR_Launcher as launcher
+
+
+def build_archive(path, small_files, large_files, seed=0):
+    """生成与发布包形状相近的 zipball：大量小源码文件加少量大模型文件"""
+    rng = random.Random(seed)
+    root = "ExVR-bench-0000000/"
+    words = [f"value_{i}" for i in range(200)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr(root, b"")
+        for i in range(small_files):
+            lines = [" ".join(rng.choices(words, k=8)) for _ in range(rng.randint(20, 600))]
+            zip_ref.writestr(f"{root}src/pkg{i % 40}/module_{i}.py", "\n".join(lines))
+        for i in range(large_files):
+            size = rng.randint(8, 24) * 1024 * 1024
+            # 一半随机数据、一半重复数据，接近模型文件的压缩率
+            data = rng.randbytes(size // 2) + bytes(range(256)) * (size // 512)
+            zip_ref.writestr(f"{root}models/model_{i}.tflite", data)
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        infos = zip_ref.infolist()
+    return {
+        "members": len(infos),
+        "compressed_bytes": os.path.getsize(path),
+        "uncompressed_bytes": sum(info.file_size for info in infos),
+    }
+
+
+def run_worker(worker):
+    errors = []
+    worker.signals.error.connect(errors.append)
+    start = time.perf_counter()
+    worker.run()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(errors[0])
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ExVR launcher extraction benchmark")
+    parser.add_argument("--small-files", type=int, default=3000)
+    parser.add_argument("--large-files", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="exvr_bench_")
+    try:
+        zip_path = os.path.join(work_dir, "release.zip")
+        archive = build_archive(zip_path, args.small_files, args.large_files)
+
+        cases = [("extract+copy", lambda dest: launcher.ExtractWorker(
+            zip_path, os.path.join(work_dir, "extract"), dest, direct=False))]
+        for workers in args.workers:
+            cases.append((f"parallel x{workers}", lambda dest, n=workers: launcher.ExtractWorker(
+                zip_path, None, dest, workers=n)))
+
+        results = []
+        for name, make_worker in cases:
+            timings = []
+            for _ in range(args.repeat):
+                dest = os.path.join(work_dir, "exvr")
+                shutil.rmtree(dest, ignore_errors=True)
+                shutil.rmtree(os.path.join(work_dir, "extract"), ignore_errors=True)
+                timings.append(run_worker(make_worker(dest)))
+            results.append({"name": name, "seconds": min(timings)})
+
+        baseline = results[0]["seconds"]
+        for result in results:
+            result["speedup"] = round(baseline / result["seconds"], 2)
+            result["seconds"] = round(result["seconds"], 3)
+        print(json.dumps({"archive": archive, "cpu_count": os.cpu_count(), "results": results}, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""启动器各关键路径的基准测试：下载、解压+复制、模块替换和热启动
+
+在本地 HTTP 服务上提供合成的 Python 安装包和 zipball，平台相关的调用全部替换掉，Linux 下即可运行。
+结果以 JSON 输出，便于在不同提交之间对比。
+
+python benchmarks/bench_launcher.py [--installer-mb 32] [--small-files 2000] [--large-files 4] [--output result.json]
+"""
+import argparse
+import contextlib
+import hashlib
+import http.server
+import io
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+from bench_extract import build_archive, run_worker, launcher
+
+
+class LaunchReached(BaseException):
+    """在 Popen 处中断 _run_application，继承 BaseException 以免被启动器的 except Exception 捕获"""
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """支持 Range、If-Range 和 HEAD 的静态文件服务，行为接近 GitHub 和镜像站"""
+
+    protocol_version = "HTTP/1.1"
+    files = {}
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head):
+        entry = self.files.get(self.path)
+        if entry is None:
+            self.send_error(404)
+            return
+        data, etag = entry
+        start, end = 0, len(data) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        partial = match is not None and self.headers.get("If-Range", etag) == etag
+        if partial:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+        self.send_response(206 if partial else 200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        if partial:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        if not head:
+            view = memoryview(data)
+            for offset in range(start, end + 1, 256 * 1024):
+                self.wfile.write(view[offset:min(offset + 256 * 1024, end + 1)])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(files):
+    RangeRequestHandler.files = {path: (data, f'"{hashlib.sha256(data).hexdigest()[:16]}"')
+                                 for path, data in files.items()}
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_installer(size_mb, seed=0):
+    """大小接近 python-3.11.9-amd64.exe 的不可压缩数据"""
+    return random.Random(seed).randbytes(size_mb * 1024 * 1024)
+
+
+def best_of(repeat, setup, measure):
+    timings = []
+    for _ in range(repeat):
+        setup()
+        timings.append(measure())
+    return min(timings)
+
+
+def bench_download(base_url, name, size, work_dir, segments_list, repeat):
+    results = []
+    save_path = os.path.join(work_dir, "download", name)
+    url = f"{base_url}/{name}"
+
+    def clean():
+        shutil.rmtree(os.path.join(work_dir, "download"), ignore_errors=True)
+        shutil.rmtree(os.path.join(work_dir, launcher.PARTIAL_DOWNLOAD_FOLDER), ignore_errors=True)
+
+    for segments in segments_list:
+        seconds = best_of(repeat, clean, lambda: run_worker(
+            launcher.DownloadWorker(url, save_path, segments=segments, use_cache=False)))
+        results.append({"name": f"download {name} x{segments}", "seconds": round(seconds, 3),
+                        "mb_per_second": round(size / seconds / (1024 * 1024), 1)})
+
+    # 第一次写入缓存，之后测量命中缓存的耗时
+    clean()
+    run_worker(launcher.DownloadWorker(url, save_path))
+    seconds = best_of(repeat, clean, lambda: run_worker(launcher.DownloadWorker(url, save_path)))
+    results.append({"name": f"download {name} cached", "seconds": round(seconds, 3)})
+    return results
+
+
+def bench_extract_copy(zip_path, work_dir, repeat):
+    dest = os.path.join(work_dir, "exvr")
+    extract_path = os.path.join(work_dir, "extract")
+
+    def clean():
+        shutil.rmtree(dest, ignore_errors=True)
+        shutil.rmtree(extract_path, ignore_errors=True)
+
+    results = []
+    seconds = best_of(repeat, clean, lambda: run_worker(
+        launcher.ExtractWorker(zip_path, extract_path, dest, direct=False)))
+    results.append({"name": "ExtractWorker extract+copy", "seconds": round(seconds, 3)})
+    seconds = best_of(repeat, clean, lambda: run_worker(launcher.ExtractWorker(zip_path, None, dest)))
+    results.append({"name": "ExtractWorker direct", "seconds": round(seconds, 3)})
+
+    def extract_only():
+        clean()
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            zip_ref.extractall(extract_path)
+
+    def copy():
+        source = os.path.join(extract_path, os.listdir(extract_path)[0])
+        start = time.perf_counter()
+        launcher.copy_with_ignore(source, dest, launcher.IGNORED_FOLDERS)
+        return time.perf_counter() - start
+
+    results.append({"name": "copy_with_ignore", "seconds": round(best_of(repeat, extract_only, copy), 3)})
+    clean()
+    return results
+
+
+def build_install_tree(install_path, module_size):
+    """构造一个已安装的目录：venv、site-packages 中的包元数据和需要替换的模块文件"""
+    exvr_path = os.path.join(install_path, "exvr")
+    site_packages = os.path.join(exvr_path, "venv", "Lib", "site-packages")
+    os.makedirs(os.path.join(install_path, "python"), exist_ok=True)
+    os.makedirs(os.path.join(exvr_path, "venv", "Scripts"), exist_ok=True)
+    open(os.path.join(exvr_path, "venv", "Scripts", "python.exe"), "wb").close()
+    with open(os.path.join(exvr_path, "venv", "pyvenv.cfg"), "w", encoding="utf-8") as f:
+        f.write(f"version = {launcher.PYTHON_VERSION}.9\n")
+    with open(os.path.join(exvr_path, "main.py"), "w", encoding="utf-8") as f:
+        f.write("print('ExVR')\n")
+
+    requirements = []
+    for i in range(40):
+        name, version = f"package-{i}", f"1.{i}.0"
+        requirements.append(f"{name}>=1.0")
+        dist_info = os.path.join(site_packages, f"package_{i}-{version}.dist-info")
+        os.makedirs(dist_info, exist_ok=True)
+        with open(os.path.join(dist_info, "METADATA"), "w", encoding="utf-8") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\n")
+    with open(os.path.join(exvr_path, "requirements.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(requirements) + "\n")
+
+    rng = random.Random(1)
+    for source, target in launcher.LAU_MAPPING.items():
+        source_path = os.path.join(exvr_path, source)
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        with open(source_path, "wb") as f:
+            f.write(rng.randbytes(module_size))
+        os.makedirs(os.path.dirname(os.path.join(site_packages, target)), exist_ok=True)
+    return exvr_path
+
+
+def bench_replace_modules(exvr_path, repeat):
+    seconds = best_of(repeat, lambda: None, lambda: timed(launcher.replace_modules_with_json, exvr_path))
+    return [{"name": "replace_modules_with_json", "seconds": round(seconds, 4)}]
+
+
+def bench_warm_launch(install_path, work_dir, repeat):
+    """测量 _run_application 从开始到调用 Popen 的耗时，第一次运行后依赖检查走指纹缓存"""
+    reached = {}
+
+    def fake_popen(*args, **kwargs):
+        reached["time"] = time.perf_counter()
+        raise LaunchReached()
+
+    class App:
+        def quit(self):
+            pass
+
+    def launch():
+        args = argparse.Namespace(log=False, verify=False, trace=False, headless=True, install_path=None, update=None)
+        installer = launcher.SilentInstaller(launcher.ConsoleInstallerUI(App(), args), args)
+        installer.install_path = install_path
+        installer.show_announcement = False
+        start = time.perf_counter()
+        try:
+            installer._run_application()
+            raise RuntimeError("_run_application did not reach Popen")
+        except LaunchReached:
+            return reached["time"] - start
+        finally:
+            os.chdir(work_dir)
+
+    def fast_launch():
+        # main() 里不加载界面的热启动路径
+        args = argparse.Namespace(log=False, verify=False, trace=False, headless=False, install_path=None, update=None)
+        start = time.perf_counter()
+        try:
+            launcher.warm_launch(args)
+            raise RuntimeError("warm_launch did not reach Popen")
+        except LaunchReached:
+            return reached["time"] - start
+        finally:
+            os.chdir(work_dir)
+
+    original_popen = subprocess.Popen
+    original_create_tmp_folder = launcher.create_tmp_folder
+    subprocess.Popen = fake_popen
+    launcher.create_tmp_folder = lambda: os.path.join(work_dir, "tmp")
+    try:
+        cold = launch()
+        warm = best_of(repeat, lambda: None, launch)
+        launcher.set_install_path(install_path)
+        launcher.set_python_path(os.path.join(install_path, "python", "python.exe"))
+        fast = best_of(repeat, lambda: None, fast_launch)
+    finally:
+        subprocess.Popen = original_popen
+        launcher.create_tmp_folder = original_create_tmp_folder
+    return [{"name": "launch to Popen (first)", "seconds": round(cold, 4)},
+            {"name": "launch to Popen (warm)", "seconds": round(warm, 4)},
+            {"name": "warm_launch to Popen", "seconds": round(fast, 4)}]
+
+
+def bench_import_time(budget_ms, repeat):
+    """用 -X importtime 测量导入启动器模块的耗时，热启动路径不应加载 PySide6"""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ExVR_Launcher"],
+                                 capture_output=True, text=True, cwd=repo_root)
+        if process.returncode != 0:
+            raise RuntimeError(process.stderr.strip().splitlines()[-1])
+        imports = []
+        for line in process.stderr.splitlines():
+            match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+            if match:
+                imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3))))
+        total = next(cumulative for name, _, cumulative, _ in imports if name == "ExVR_Launcher")
+        if best is None or total < best[0]:
+            best = (total, imports)
+    total, imports = best
+    # 子模块的输出在父模块之前，从 ExVR_Launcher 往前到上一个顶层导入之间的都是它的依赖
+    end = next(i for i, item in enumerate(imports) if item[0] == "ExVR_Launcher")
+    start = max((i for i in range(end) if imports[i][3] == 0), default=-1) + 1
+    heaviest = sorted(((name, cumulative) for name, _, cumulative, depth in imports[start:end] if depth == 2),
+                      key=lambda item: item[1], reverse=True)[:8]
+    return [{
+        "name": "import ExVR_Launcher",
+        "seconds": round(total / 1000000, 4),
+        "budget_seconds": budget_ms / 1000,
+        "within_budget": total / 1000 <= budget_ms,
+        "qt_imported": any(name.startswith("PySide6") for name, _, _, _ in imports),
+        "heaviest": [{"module": name, "seconds": round(cumulative / 1000000, 4)} for name, cumulative in heaviest],
+    }]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def stub_platform():
+    # Windows 才有的 subprocess 标志，以及按 Windows 分隔符写的模块映射
+    for flag in ("CREATE_NO_WINDOW", "CREATE_NEW_CONSOLE"):
+        if not hasattr(subprocess, flag):
+            setattr(subprocess, flag, 0)
+    if os.sep != "\\":
+        launcher.LAU_MAPPING = {source.replace("\\", os.sep): target.replace("\\", os.sep)
+                                for source, target in launcher.LAU_MAPPING.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ExVR launcher benchmark suite")
+    parser.add_argument("--installer-mb", type=int, default=32)
+    parser.add_argument("--small-files", type=int, default=2000)
+    parser.add_argument("--large-files", type=int, default=4)
+    parser.add_argument("--module-kb", type=int, default=2048)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, launcher.DOWNLOAD_SEGMENTS])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=int, default=150)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    stub_platform()
+    original_cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="exvr_bench_")
+    # 配置、缓存和断点续传文件都放在当前目录下
+    os.chdir(work_dir)
+    server = None
+    try:
+        zip_path = os.path.join(work_dir, "release.zip")
+        archive = build_archive(zip_path, args.small_files, args.large_files)
+        with open(zip_path, "rb") as f:
+            zipball = f.read()
+        installer = build_installer(args.installer_mb)
+        server, base_url = start_server({"/python-installer.exe": installer, "/zipball.zip": zipball})
+
+        results = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            results += bench_download(base_url, "python-installer.exe", len(installer), work_dir, args.segments,
+                                      args.repeat)
+            results += bench_download(base_url, "zipball.zip", len(zipball), work_dir, args.segments, args.repeat)
+            results += bench_extract_copy(zip_path, work_dir, args.repeat)
+            exvr_path = build_install_tree(os.path.join(work_dir, "install"), args.module_kb * 1024)
+            results += bench_replace_modules(exvr_path, args.repeat)
+            results += bench_warm_launch(os.path.join(work_dir, "install"), work_dir, args.repeat)
+        results += bench_import_time(args.import_budget_ms, args.repeat)
+
+        output = {
+            "commit": get_commit(),
+            "platform": sys.platform,
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "installer_bytes": len(installer),
+            "archive": archive,
+            "results": results,
+        }
+        text = json.dumps(output, indent=2)
+        print(text)
+        if args.output:
+            with open(os.path.join(original_cwd, args.output), "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+    finally:
+        if server:
+            server.shutdown()
+        os.chdir(original_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()